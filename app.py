@@ -113,45 +113,41 @@
 
 
 
+from datetime import timedelta
+
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 
-# --- Load dataset ---
-@st.cache_data
-def load_data():
-    df = pd.read_csv("output1.csv")  # Update the file path if necessary
-    df["date"] = pd.to_datetime(df["date"])
-    df['year'] = df['date'].dt.year
-    df['month'] = df['date'].dt.month
-    return df
+import charts
+import dashboard
+import instrument
+import service
 
-df = load_data()
+# --- Load aggregates ---
+# Queries go to the shared data service when DATA_SERVICE_URL is set; otherwise
+# this process builds the cube from output1.csv once and reads it directly
+@st.cache_resource
+def local_source():
+    return service.CsvSource("output1.csv")
 
-# --- Preprocess Data ---
-sentiment_trend = df.groupby(["year", "category"])[["compound"]].mean().reset_index()
-years = sorted(sentiment_trend["year"].unique())
+data = service.connect(local_source)
+if data is None:
+    st.error("The data service has no snapshot yet. Run `python worker.py --once` first.")
+    st.stop()
+version = data.version
 
 # --- Sidebar Navigation ---
 st.sidebar.title("📌 Navigation")
-page = st.sidebar.radio("Go to", ["Home", "Sentiment Analysis", "Trends", "About"])
+page = st.sidebar.radio("Go to", ["Home", "Sentiment Analysis", "Trends", "Rolling Trends", "Search", "Top Terms", "About"])
+
+# Time figure construction + rendering of the selected page
+page_timer = instrument.start(f"page:{page}")
 
 # --- Home Page ---
 if page == "Home":
     st.title("📊 News Sentiment Analysis")
     st.subheader("📈 Sentiment Trends Over Time")
 
-    fig1 = px.line(
-        sentiment_trend,
-        x="category",
-        y="compound",
-        color="year",
-        markers=True,
-        title="Sentiment Score by Year",
-        labels={"compound": "Average Sentiment Score", "category": "News Category"}
-    )
-    st.plotly_chart(fig1)
+    st.plotly_chart(dashboard.all_years_chart(data, version))
 
 # --- Sentiment Analysis Page ---
 elif page == "Sentiment Analysis":
@@ -159,21 +155,11 @@ elif page == "Sentiment Analysis":
 
     st.subheader("📈 Sentiment Score by Category Over Time")
 
-    fig12 = px.bar(
-        sentiment_trend, x="category", y="compound", color="category",
-        animation_frame="year", animation_group="category", range_y=[-1, 1],
-        title="Sentiment Score by Category Over Time",
-        labels={"compound": "Average Sentiment Score", "category": "News Category"}
-    )
-
-    fig12.update_layout(
-        xaxis_title="News Category",
-        yaxis_title="Average Sentiment Score",
-        title_x=0.5,
-        showlegend=True
-    )
+    # Only the chosen year's bars are sent, instead of every animation frame
+    years = dashboard.load_years(data, version)
+    selected_year = st.select_slider("Year:", options=years, value=years[-1])
 
-    st.plotly_chart(fig12)
+    st.plotly_chart(dashboard.category_chart(data, version, selected_year))
 
 # --- Trends Page ---
 elif page == "Trends":
@@ -181,43 +167,57 @@ elif page == "Trends":
 
     st.write("Select a year to view sentiment trends across different categories.")
 
-    # --- Create dropdown-based interactive plot ---
-    fig = go.Figure()
-
-    # Add traces for each year
-    for i, year in enumerate(years):
-        df_year = sentiment_trend[sentiment_trend["year"] == year]
-        fig.add_trace(go.Scatter(
-            x=df_year["category"], 
-            y=df_year["compound"],
-            mode='lines+markers', 
-            name=str(year),
-            visible=(i == 0)  # Show only the first year's data initially
-        ))
-
-    # Create dropdown menu
-    year_dropdown = [
-        dict(
-            method='update',
-            args=[{'visible': [y == year for y in years]},
-                  {'title': f'Sentiment Score by Year: {year}'}],
-            label=str(year)
-        ) for year in years
-    ]
-
-    # Update layout with dropdown
-    fig.update_layout(
-        title="Sentiment Score by Year & Category",
-        xaxis_title="News Category",
-        yaxis_title="Average Sentiment Score",
-        updatemenus=[dict(
-            buttons=year_dropdown,
-            direction='down',
-            x=0.1, xanchor='left', y=1.1, yanchor='top'
-        )]
-    )
-
-    st.plotly_chart(fig)
+    # The year is picked server-side, so the figure holds one trace rather than
+    # one per year plus a visibility mask for every dropdown entry
+    years = dashboard.load_years(data, version)
+    selected_year = st.selectbox("Select a Year:", years, index=0)
+
+    st.plotly_chart(dashboard.single_year_chart(data, version, selected_year))
+
+# --- Rolling Trends Page ---
+elif page == "Rolling Trends":
+    st.title("📈 Rolling Sentiment Trends")
+
+    first, last, all_categories, busiest = dashboard.trend_span(data, version)
+
+    window = st.select_slider("Window (days):", options=[7, 30, 90, 365], value=30)
+    start, end = st.slider("Date range:", min_value=first, max_value=last,
+                           value=(max(first, last - timedelta(days=730)), last))
+    categories = st.multiselect("Categories:", all_categories, default=busiest)
+
+    # Each chart reads prefix sums for the selected days only
+    for value in ("mean", "ewma", "count"):
+        st.plotly_chart(dashboard.rolling_chart(data, version, window, start, end, tuple(categories), value))
+
+# --- Search Page ---
+elif page == "Search":
+    st.title("🔎 Search Articles")
+
+    first, last, all_categories = dashboard.search_span(data, version)
+
+    query = st.text_input("Search headlines and descriptions:")
+    categories = st.multiselect("Categories:", all_categories)
+    start, end = st.slider("Date range:", min_value=first, max_value=last, value=(first, last),
+                           key="search_dates")
+
+    if query:
+        hits = dashboard.search_articles(data, version, query, tuple(categories) or None, start, end)
+        st.write(f"Top {len(hits)} matches")
+        st.dataframe(hits, hide_index=True)
+
+# --- Top Terms Page ---
+elif page == "Top Terms":
+    st.title("🔤 Top Terms")
+
+    groups = dashboard.term_groups(data, version)
+    by = st.radio("Group by:", [b for b in ("cluster", "category") if b in groups], horizontal=True)
+    group = st.selectbox(f"{by.title()}:", groups[by])
+    n = st.slider("Terms:", min_value=10, max_value=100, value=30)
+
+    # Drawn from term counts precomputed by the clustering stage; no headlines
+    # are scanned or joined per request
+    st.image(dashboard.cloud_image(data, version, by, group), width="stretch")
+    st.plotly_chart(charts.top_terms(dashboard.group_terms(data, version, by, group, n), f"Top Terms: {by} {group}"))
 
 # --- About Page ---
 elif page == "About":
@@ -237,32 +237,14 @@ elif page == "About":
         top_bottom_years = 2  
 
         # Dropdown selection for year
+        years = dashboard.load_years(data, version)
         selected_year = st.selectbox("Select a Year:", years, index=len(years) - 1)
 
         # Determine visible years (selected year ± top_bottom_years)
-        visible_years = list(range(max(years[0], selected_year - top_bottom_years),
-                                min(years[-1] + 1, selected_year + top_bottom_years + 1)))
-
-        # --- Create figure ---
-        fig = go.Figure()
-
-        # Add traces for each visible year
-        for year in visible_years:
-            df_year = sentiment_trend[sentiment_trend["year"] == year]
-            fig.add_trace(go.Scatter(
-                x=df_year["category"], 
-                y=df_year["compound"],
-                mode='lines+markers', 
-                name=str(year),
-                visible=True  # Show only selected range of years
-            ))
-
-        # Update layout
-        fig.update_layout(
-            title=f"Sentiment Score by Year & Category ({selected_year} ± {top_bottom_years} Years)",
-            xaxis_title="News Category",
-            yaxis_title="Average Sentiment Score",
-            showlegend=True
-        )
-
-        st.plotly_chart(fig)
+        visible_years = tuple(range(max(years[0], selected_year - top_bottom_years),
+                                    min(years[-1] + 1, selected_year + top_bottom_years + 1)))
+
+        st.plotly_chart(dashboard.window_chart(data, version, selected_year, visible_years, top_bottom_years))
+
+page_timer.stop()
+instrument.export_prometheus()
@@ -1,42 +1,35 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 
-# --- Load dataset ---
-@st.cache_data
-def load_data():
-    df = pd.read_csv("output1.csv")  # Ensure correct path
-    df["date"] = pd.to_datetime(df["date"])
-    df['year'] = df['date'].dt.year
-    df['month'] = df['date'].dt.month
-    return df
+import dashboard
+import instrument
+import service
 
-df = load_data()
+# --- Load aggregates ---
+# Queries go to the shared data service when DATA_SERVICE_URL is set; otherwise
+# this process builds the cube from output1.csv once and reads it directly
+@st.cache_resource
+def local_source():
+    return service.CsvSource("output1.csv")
 
-# --- Preprocess Data ---
-sentiment_trend = df.groupby(["year", "category"])[["compound"]].mean().reset_index()
-years = sorted(sentiment_trend["year"].unique())
+data = service.connect(local_source)
+if data is None:
+    st.error("The data service has no snapshot yet. Run `python worker.py --once` first.")
+    st.stop()
+version = data.version
 
 # --- Sidebar Navigation ---
 st.sidebar.title("📌 Navigation")
 page = st.sidebar.radio("Go to", ["Score by Year", "Score by category over time", "Year +2", "one year"])
 
+# Time figure construction + rendering of the selected page
+page_timer = instrument.start(f"page:{page}")
+
 # --- Home Page ---
 if page == "Score by Year":
     st.title("Sentiment score by year")
     # st.subheader("📈 Sentiment Trends Over Time")
 
-    fig1 = px.line(
-        sentiment_trend,
-        x="category",
-        y="compound",
-        color="year",
-        markers=True,
-        title="Sentiment Score by Year",
-        labels={"compound": "Average Sentiment Score", "category": "News Category"}
-    )
-    st.plotly_chart(fig1)
+    st.plotly_chart(dashboard.all_years_chart(data, version))
 
 # --- Sentiment Analysis Page ---
 elif page == "Score by category over time":
@@ -44,21 +37,11 @@ elif page == "Score by category over time":
 
     st.subheader("Sentiment Score by Category Over Time")
 
-    fig12 = px.bar(
-        sentiment_trend, x="category", y="compound", color="category",
-        animation_frame="year", animation_group="category", range_y=[-1, 1],
-        title="Sentiment Score by Category Over Time",
-        labels={"compound": "Average Sentiment Score", "category": "News Category"}
-    )
-
-    fig12.update_layout(
-        xaxis_title="News Category",
-        yaxis_title="Average Sentiment Score",
-        title_x=0.5,
-        showlegend=True
-    )
+    # Only the chosen year's bars are sent, instead of every animation frame
+    years = dashboard.load_years(data, version)
+    selected_year = st.select_slider("Year:", options=years, value=years[-1])
 
-    st.plotly_chart(fig12)
+    st.plotly_chart(dashboard.category_chart(data, version, selected_year))
 
 # --- Trends Page ---
 elif page == "Year +2":
@@ -70,80 +53,31 @@ elif page == "Year +2":
     top_bottom_years = 2  
 
     # Dropdown selection for year
+    years = dashboard.load_years(data, version)
     selected_year = st.selectbox("Select a Year:", years, index=len(years) - 1)
 
     # Determine visible years (selected year ± top_bottom_years)
-    visible_years = list(range(max(years[0], selected_year - top_bottom_years),
-                               min(years[-1] + 1, selected_year + top_bottom_years + 1)))
-
-    # --- Create figure ---
-    fig = go.Figure()
-
-    # Add traces for each visible year
-    for year in visible_years:
-        df_year = sentiment_trend[sentiment_trend["year"] == year]
-        fig.add_trace(go.Scatter(
-            x=df_year["category"], 
-            y=df_year["compound"],
-            mode='lines+markers', 
-            name=str(year),
-            visible=True  # Show only selected range of years
-        ))
-
-    # Update layout
-    fig.update_layout(
-        title=f"Sentiment Score by Year & Category ({selected_year} ± {top_bottom_years} Years)",
-        xaxis_title="News Category",
-        yaxis_title="Average Sentiment Score",
-        showlegend=True
-    )
-
-    st.plotly_chart(fig)
+    visible_years = tuple(range(max(years[0], selected_year - top_bottom_years),
+                                min(years[-1] + 1, selected_year + top_bottom_years + 1)))
+
+    st.plotly_chart(dashboard.window_chart(data, version, selected_year, visible_years, top_bottom_years))
 
 elif page == "one year":
     st.title(" Sentiment Trends Over Time")
 
     st.write("Select a year to view sentiment trends across different categories.")
 
-    # --- Create dropdown-based interactive plot ---
-    fig = go.Figure()
-
-    # Add traces for each year
-    for i, year in enumerate(years):
-        df_year = sentiment_trend[sentiment_trend["year"] == year]
-        fig.add_trace(go.Scatter(
-            x=df_year["category"], 
-            y=df_year["compound"],
-            mode='lines+markers', 
-            name=str(year),
-            visible=(i == 0)  # Show only the first year's data initially
-        ))
-
-    # Create dropdown menu
-    year_dropdown = [
-        dict(
-            method='update',
-            args=[{'visible': [y == year for y in years]},
-                  {'title': f'Sentiment Score by Year: {year}'}],
-            label=str(year)
-        ) for year in years
-    ]
-
-    # Update layout with dropdown
-    fig.update_layout(
-        title="Sentiment Score by Year & Category",
-        xaxis_title="News Category",
-        yaxis_title="Average Sentiment Score",
-        updatemenus=[dict(
-            buttons=year_dropdown,
-            direction='down',
-            x=0.1, xanchor='left', y=1.1, yanchor='top'
-        )]
-    )
-
-    st.plotly_chart(fig)
+    # The year is picked server-side, so the figure holds one trace rather than
+    # one per year plus a visibility mask for every dropdown entry
+    years = dashboard.load_years(data, version)
+    selected_year = st.selectbox("Select a Year:", years, index=0)
+
+    st.plotly_chart(dashboard.single_year_chart(data, version, selected_year))
 
 # # --- About Page ---
 # elif page == "About":
 #     st.title("ℹ️ About This Project")
 #     st.write("**Senticonomy** is a news sentiment analysis platform that visualizes economic impacts.")
+
+page_timer.stop()
+instrument.export_prometheus()
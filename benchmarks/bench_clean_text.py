@@ -0,0 +1,55 @@
+"""Benchmark textclean.clean_series against per-row cleaning.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_clean_text --rows 200000
+"""
+import argparse
+import re
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import generate_news
+from textclean import clean_series, clean_text
+
+
+# clean_text as it was before textclean: stopword set rebuilt on every call
+def legacy_clean_text(text):
+    from nltk.corpus import stopwords
+    if pd.isnull(text):
+        return ""
+    text = text.lower()
+    text = re.sub(r'https?://\S+|[^a-zA-Z\s]', '', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    stop_words = set(stopwords.words('english'))
+    return " ".join(word for word in text.split() if word not in stop_words)
+
+
+def _time(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    texts = generate_news(args.rows)["headline"]
+    legacy_s, expected = _time(lambda: texts.apply(legacy_clean_text))
+    base_s, per_row = _time(lambda: texts.apply(clean_text))
+    fast_s, result = _time(lambda: clean_series(texts, workers=args.workers))
+
+    assert per_row.tolist() == expected.tolist(), "clean_text output differs from the legacy function"
+    assert result.tolist() == expected.tolist(), "clean_series output differs from the legacy function"
+    print(f"rows={args.rows} workers={args.workers}")
+    print(f"apply(legacy clean_text): {legacy_s:.3f}s")
+    print(f"apply(clean_text):        {base_s:.3f}s ({legacy_s / base_s:.1f}x)")
+    print(f"clean_series:             {fast_s:.3f}s ({legacy_s / fast_s:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Benchmark multi-field scoring throughput as the worker count grows.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_scoring --rows 200000 --fields headline,description
+"""
+import argparse
+import os
+import time
+
+from benchmarks.synthetic import generate_news
+from scoring import score_fields, score_texts
+from textclean import clean_columns
+
+
+def _time(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--fields", default="headline,description")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    fields = [f for f in args.fields.split(",") if f]
+    df = clean_columns(generate_news(args.rows, duplicate_ratio=0.0))
+
+    counts = [1]
+    while counts[-1] * 2 <= args.max_workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != args.max_workers:
+        counts.append(args.max_workers)
+
+    print(f"rows={args.rows} fields={','.join(fields)}")
+    base = None
+    for workers in counts:
+        seconds, scores = _time(lambda: score_fields(df, fields, workers=workers))
+        base = base or seconds
+        texts = args.rows * len(fields)
+        print(f"workers={workers:<3} {seconds:8.3f}s {texts / seconds:10,.0f} texts/s ({base / seconds:.2f}x)")
+
+    if "headline" in fields:
+        expected = score_texts(df["cleaned_headline"], workers=1)
+        assert (scores["headline_compound"] == expected["compound"]).all(), "score_fields differs from score_texts"
+
+
+if __name__ == "__main__":
+    main()
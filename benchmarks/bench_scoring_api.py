@@ -0,0 +1,108 @@
+"""Benchmark the scoring API: batch throughput, micro-batched latency and cache hit rate.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_scoring_api --rows 50000 --clients 16 --p95-ms 50 --min-throughput 2000
+
+Starts a ScoringService on a free localhost port, replays synthetic
+headlines (with the dataset's repeat rate) as batch and single-text calls,
+and exits non-zero if the latency or throughput target is missed.
+"""
+import argparse
+import asyncio
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from benchmarks.synthetic import generate_news
+from scoring_api import ScoringClient, ScoringService, Scorer
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start(service, port):
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_until_complete, args=(service.serve("127.0.0.1", port),), daemon=True)
+    thread.start()
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("Scoring service did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--duplicate-ratio", type=float, default=0.3)
+    parser.add_argument("--batch", type=int, default=1000, help="texts per batch call")
+    parser.add_argument("--singles", type=int, default=2000, help="single-text calls to time")
+    parser.add_argument("--clients", type=int, default=16, help="concurrent single-text callers")
+    parser.add_argument("--p95-ms", type=float, default=50.0)
+    parser.add_argument("--min-throughput", type=float, default=2000.0, help="batch texts/sec")
+    args = parser.parse_args()
+
+    headlines = generate_news(args.rows, duplicate_ratio=args.duplicate_ratio)["headline"].tolist()
+    scorer = Scorer()
+    port = _free_port()
+    service = ScoringService(scorer)
+    _start(service, port)
+    client = ScoringClient(f"http://127.0.0.1:{port}")
+    print(f"rows={args.rows} duplicate_ratio={args.duplicate_ratio} cluster_model={scorer.model is not None}")
+
+    # Batch calls over HTTP: a cold pass, then the same texts again from cache
+    for label in ("cold", "warm"):
+        start = time.perf_counter()
+        for i in range(0, len(headlines), args.batch):
+            client.score(headlines[i:i + args.batch])
+        seconds = time.perf_counter() - start
+        print(f"batch {label:<5} {seconds:8.3f}s {len(headlines) / seconds:10,.0f} texts/s")
+        if label == "cold":
+            throughput = len(headlines) / seconds
+
+    # Single-text calls from concurrent clients, half new and half repeated
+    rng = np.random.default_rng(0)
+    fresh = [f"{h} {i}" for i, h in enumerate(rng.choice(headlines, args.singles // 2))]
+    singles = fresh + list(rng.choice(headlines, args.singles - len(fresh)))
+    rng.shuffle(singles)
+
+    def timed(text):
+        start = time.perf_counter()
+        client.score_one(text)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.clients) as pool:
+        latencies = np.array(list(pool.map(timed, singles))) * 1000
+    seconds = time.perf_counter() - start
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    print(f"single x{args.clients:<3} {seconds:8.3f}s {len(singles) / seconds:10,.0f} req/s "
+          f"p50={p50:.1f}ms p95={p95:.1f}ms p99={p99:.1f}ms")
+
+    stats = client.stats()
+    print(f"cache hit_rate={stats['cache']['hit_rate']:.1%} size={stats['cache']['size']:,} "
+          f"micro_batches={stats['micro_batches']['batches']} mean_batch={stats['micro_batches']['mean_batch']:.1f}")
+
+    failed = []
+    if p95 > args.p95_ms:
+        failed.append(f"p95 {p95:.1f}ms > {args.p95_ms}ms")
+    if throughput < args.min_throughput:
+        failed.append(f"throughput {throughput:,.0f} < {args.min_throughput:,.0f} texts/s")
+    if failed:
+        print("❌ Targets missed:", "; ".join(failed))
+        sys.exit(1)
+    print("✅ Targets met")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Benchmark dashboard cold start: import time and time to first render.
+
+Run from the directory holding the dashboard data (output1.csv, snapshots/):
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --scripts appmain.py --page Search --top 15
+
+Each entry point runs once in a fresh interpreter under ``python -X importtime``
+through streamlit's AppTest, which executes the script the way a new session
+does. Reports the wall time until the first run completes (first paint), the
+import time and the slowest top-level imports, and flags heavy packages that
+were loaded.
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+# Packages that should only load on pages that need them
+HEAVY = ("sklearn", "scipy", "plotly", "nltk", "psycopg2", "vaderSentiment")
+
+_CHILD = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=600)
+ready = time.perf_counter()
+at.run()
+report = {"harness": ready - start, "first_run": time.perf_counter() - ready,
+          "exceptions": [str(e.value) for e in at.exception]}
+print("FIRST_RUN_DONE", file=sys.stderr, flush=True)
+if sys.argv[2] in at.sidebar.radio[0].options:
+    before = set(sys.modules)
+    switch = time.perf_counter()
+    at.sidebar.radio[0].set_value(sys.argv[2]).run()
+    report["page_run"] = time.perf_counter() - switch
+    report["page_imports"] = sorted({m.split(".")[0] for m in set(sys.modules) - before})
+print("STARTUP " + json.dumps(report))
+"""
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def _parse_importtime(stderr):
+    # Top-level imports (no indent) up to the first paint with cumulative
+    # microseconds, plus every module seen by then
+    top, seen = {}, set()
+    for line in stderr.split("FIRST_RUN_DONE")[0].splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(2)), len(match.group(3)), match.group(4)
+        seen.add(name.split(".")[0])
+        if indent == 1:
+            top[name] = top.get(name, 0) + cumulative
+    return top, seen
+
+
+def measure(script, page=""):
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD, script, page],
+        capture_output=True, text=True, env={**os.environ, "PYTHONWARNINGS": "ignore"},
+    )
+    wall = time.perf_counter() - start
+    reports = [line[len("STARTUP "):] for line in proc.stdout.splitlines() if line.startswith("STARTUP ")]
+    if proc.returncode != 0 or not reports:
+        raise RuntimeError(f"{script} failed:\n{proc.stderr[-2000:]}")
+    report = json.loads(reports[-1])
+    top, seen = _parse_importtime(proc.stderr)
+    report.update(wall=wall, imports=top, heavy=[m for m in HEAVY if m in seen])
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scripts", default="appmain.py,app.py,apps.py")
+    parser.add_argument("--page", default="", help="sidebar page to switch to after the first run")
+    parser.add_argument("--top", type=int, default=10, help="slowest top-level imports to list")
+    parser.add_argument("--json", default=None, help="also write the reports to this file")
+    args = parser.parse_args()
+
+    reports = {}
+    for script in [s for s in args.scripts.split(",") if s]:
+        report = reports[script] = measure(script, args.page)
+        total = sum(report["imports"].values()) / 1e6
+        print(f"{script:<12} first paint {report['wall']:6.2f}s  "
+              f"(script run {report['first_run']:5.2f}s, imports {total:5.2f}s)  "
+              f"heavy: {', '.join(report['heavy']) or 'none'}")
+        for name, us in sorted(report["imports"].items(), key=lambda kv: -kv[1])[:args.top]:
+            print(f"    {us / 1e6:6.3f}s  {name}")
+        if args.page and "page_run" not in report:
+            print(f"    page {args.page!r}: not in this app")
+        elif "page_run" in report:
+            print(f"    page {args.page!r}: {report['page_run']:.2f}s, "
+                  f"loaded {', '.join(report['page_imports']) or 'nothing new'}")
+        if report["exceptions"]:
+            print("❌ Error:", report["exceptions"][0])
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
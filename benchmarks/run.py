@@ -0,0 +1,210 @@
+"""End-to-end pipeline and dashboard benchmark.
+
+Run from the repository root:
+
+    python -m benchmarks.run --size 10k
+    python -m benchmarks.run --size 200k --save-baseline benchmarks/baseline-200k.json
+    python -m benchmarks.run --size 200k --compare benchmarks/baseline-200k.json
+
+Every stage runs against synthetic NewsData (see benchmarks.synthetic) served
+from a SQLite stand-in, and reports wall time, rows and peak traced memory.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import plotly.express as px
+import plotly.graph_objects as go
+
+import charts
+import db
+from benchmarks.synthetic import SIZES, generate_news, write_sqlite
+from columnar import load_columnar
+from cube import build_cubes, mean_trend
+from pipeline import add_clusters, add_sentiment, fetch_data
+
+# name -> (setup(ctx), run(ctx) -> rows); setup is not timed
+STAGES = {}
+
+
+def stage(name, setup=None):
+    def register(fn):
+        STAGES[name] = (setup, fn)
+        return fn
+    return register
+
+
+# The stages call the pipeline's own functions, so they time what production runs
+@stage("fetch")
+def _fetch(ctx):
+    ctx["df"] = fetch_data(chunk_size=50000)
+    return len(ctx["df"])
+
+
+@stage("sentiment")
+def _sentiment(ctx):
+    # Cleaning and scoring, as run_pipeline does per chunk
+    ctx["df"] = add_sentiment(ctx["df"])
+    return len(ctx["df"])
+
+
+@stage("cluster")
+def _cluster(ctx):
+    add_clusters(ctx["df"], backend=ctx["cluster_backend"], refit=True)
+    return len(ctx["df"])
+
+
+def _write_csv(ctx):
+    ctx["csv_path"] = os.path.join(ctx["workdir"], "output1.csv")
+    ctx["df"].to_csv(ctx["csv_path"], index=False)
+
+
+@stage("load_data", setup=_write_csv)
+def _load_data(ctx):
+    ctx["loaded"] = load_columnar(ctx["csv_path"], columns=["date", "category", "compound"])
+    return len(ctx["loaded"])
+
+
+@stage("aggregate")
+def _aggregate(ctx):
+    ctx["cubes"] = build_cubes(ctx["loaded"])
+    ctx["sentiment_trend"] = mean_trend(ctx["cubes"]["year"])
+    return len(ctx["loaded"])
+
+
+def _legacy_figures(trend):
+    # The pre-charts pages: every year as a hidden trace with a dropdown
+    # visibility mask, and every animation frame serialized up front
+    years = sorted(trend["year"].unique())
+    per_year = go.Figure()
+    for i, year in enumerate(years):
+        df_year = trend[trend["year"] == year]
+        per_year.add_trace(go.Scatter(x=df_year["category"], y=df_year["compound"],
+                                      mode="lines+markers", name=str(year), visible=(i == 0)))
+    per_year.update_layout(updatemenus=[dict(buttons=[
+        dict(method="update", args=[{"visible": [y == year for y in years]}], label=str(year))
+        for year in years
+    ])])
+    return [
+        px.line(trend, x="category", y="compound", color="year", markers=True),
+        px.bar(trend, x="category", y="compound", color="category",
+               animation_frame="year", animation_group="category", range_y=[-1, 1]),
+        per_year,
+    ]
+
+
+@stage("figures_legacy")
+def _figures_legacy(ctx):
+    trend = ctx["sentiment_trend"]
+    ctx.setdefault("figure_bytes", {})["figures_legacy"] = sum(
+        charts.payload_bytes(fig) for fig in _legacy_figures(trend))
+    return len(trend)
+
+
+@stage("figures")
+def _figures(ctx):
+    trend = ctx["sentiment_trend"]
+    year = trend["year"].max()
+    figs = [
+        charts.year_lines(trend),
+        charts.category_bars(trend, year),
+        charts.single_year(trend, year),
+    ]
+    ctx.setdefault("figure_bytes", {})["figures"] = sum(charts.payload_bytes(fig) for fig in figs)
+    return len(trend)
+
+
+def run(size, stages, cluster_backend="minibatch", track_memory=True):
+    rows = SIZES[size]
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        print(f"Generating {rows:,} synthetic articles...", file=sys.stderr)
+        data = generate_news(rows)
+        db_path = os.path.join(workdir, "news.db")
+        write_sqlite(data, db_path).close()
+        ctx = {"workdir": workdir, "cluster_backend": cluster_backend}
+        del data
+        # fetch_data borrows from the shared pool; point it at the synthetic table
+        db.close_pool()
+        db.DB_SQLITE_PATH = db_path
+
+        for name in stages:
+            setup, fn = STAGES[name]
+            if setup:
+                setup(ctx)
+            if track_memory:
+                tracemalloc.start()
+            start = time.perf_counter()
+            n = fn(ctx)
+            seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] if track_memory else 0
+            if track_memory:
+                tracemalloc.stop()
+            results[name] = {"seconds": round(seconds, 4), "rows": n, "peak_mb": round(peak / 2 ** 20, 1)}
+            print(f"{name:14} {seconds:9.3f}s {n:>10,} rows {peak / 2 ** 20:9.1f} MB peak", file=sys.stderr)
+
+        db.close_pool()
+        for name, size in ctx.get("figure_bytes", {}).items():
+            results[name]["bytes"] = size
+    return {"size": size, "rows": rows, "track_memory": track_memory, "stages": results}
+
+
+def compare(report, baseline, tolerance=0.25, min_seconds=0.05):
+    """Return a list of regressions of ``report`` against ``baseline``."""
+    regressions = []
+    for name, new in report["stages"].items():
+        old = baseline["stages"].get(name)
+        if old is None:
+            continue
+        slower = new["seconds"] - old["seconds"]
+        if slower > min_seconds and new["seconds"] > old["seconds"] * (1 + tolerance):
+            regressions.append(f"{name}: {old['seconds']:.3f}s -> {new['seconds']:.3f}s")
+        if report["track_memory"] and baseline.get("track_memory") and old["peak_mb"] > 0:
+            if new["peak_mb"] > old["peak_mb"] * (1 + tolerance) and new["peak_mb"] - old["peak_mb"] > 1:
+                regressions.append(f"{name}: {old['peak_mb']:.1f} MB -> {new['peak_mb']:.1f} MB peak")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline and dashboard stages.")
+    parser.add_argument("--size", choices=sorted(SIZES), default="10k")
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help="comma-separated subset, in order (default: all)")
+    parser.add_argument("--cluster-backend", choices=["kmeans", "minibatch"], default="minibatch")
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc (faster, no peak memory)")
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--save-baseline", help="store the report as a baseline")
+    parser.add_argument("--compare", help="baseline to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    stages = [s for s in args.stages.split(",") if s]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(unknown)}")
+
+    report = run(args.size, stages, args.cluster_backend, track_memory=not args.no_memory)
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["size"] != report["size"]:
+            parser.error(f"baseline is for size {baseline['size']}, not {report['size']}")
+        regressions = compare(report, baseline, args.tolerance)
+        for line in regressions:
+            print("REGRESSION", line)
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Synthetic News Category data matching the NewsData schema."""
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+# Named dataset sizes used by the benchmark suite
+SIZES = {
+    "10k": 10_000,
+    "200k": 200_000,
+    "2m": 2_000_000,
+}
+
+# The 42 categories of News_Category_Dataset_v3
+CATEGORIES = [
+    "ARTS", "ARTS & CULTURE", "BLACK VOICES", "BUSINESS", "COLLEGE", "COMEDY", "CRIME",
+    "CULTURE & ARTS", "DIVORCE", "EDUCATION", "ENTERTAINMENT", "ENVIRONMENT", "FIFTY",
+    "FOOD & DRINK", "GOOD NEWS", "GREEN", "HEALTHY LIVING", "HOME & LIVING", "IMPACT",
+    "LATINO VOICES", "MEDIA", "MONEY", "PARENTING", "PARENTS", "POLITICS", "QUEER VOICES",
+    "RELIGION", "SCIENCE", "SPORTS", "STYLE", "STYLE & BEAUTY", "TASTE", "TECH",
+    "THE WORLDPOST", "TRAVEL", "U.S. NEWS", "WEDDINGS", "WEIRD NEWS", "WELLNESS", "WOMEN",
+    "WORLD NEWS", "WORLDPOST",
+]
+
+WORDS = (
+    "the a of to in and for on with is at by trump new says after how why what "
+    "can be are this world people you your will from donald women it health "
+    "police killed day more out about over video photos best love kids good bad "
+    "great worst happy sad war peace win lose attack hope fear crisis support "
+    "dies dead celebrates wonderful terrible amazing awful scandal victory"
+).split()
+
+START_DATE = pd.Timestamp("2012-01-28")
+END_DATE = pd.Timestamp("2022-09-23")
+
+
+def _sentences(rng, n, min_words, max_words):
+    vocab = np.array(WORDS, dtype=object)
+    lengths = rng.integers(min_words, max_words + 1, n)
+    words = vocab[rng.integers(0, len(vocab), lengths.sum())]
+    bounds = np.concatenate([[0], np.cumsum(lengths)])
+    return [" ".join(words[bounds[i]:bounds[i + 1]]).capitalize() for i in range(n)]
+
+
+def generate_news(rows, seed=42, duplicate_ratio=0.1):
+    """Build a NewsData-shaped frame of ``rows`` synthetic articles.
+
+    About ``duplicate_ratio`` of the headlines repeat earlier ones, like the
+    syndicated stories in the real dataset. Rows are in date order, newest
+    ids last.
+    """
+    rng = np.random.default_rng(seed)
+    n_unique = max(1, int(rows * (1 - duplicate_ratio)))
+    headlines = np.array(_sentences(rng, n_unique, 4, 14), dtype=object)
+    headlines = headlines[np.concatenate([np.arange(n_unique), rng.integers(0, n_unique, rows - n_unique)])]
+    rng.shuffle(headlines)
+
+    span = (END_DATE - START_DATE).days
+    dates = START_DATE + pd.to_timedelta(np.sort(rng.integers(0, span + 1, rows)), unit="D")
+    authors = np.array([f"Author {i}" for i in range(2000)] + [None], dtype=object)
+
+    return pd.DataFrame({
+        "id": np.arange(1, rows + 1),
+        "link": [f"https://www.huffpost.com/entry/synthetic-{i}" for i in range(1, rows + 1)],
+        "headline": headlines,
+        "category": pd.Categorical.from_codes(rng.integers(0, len(CATEGORIES), rows), CATEGORIES),
+        "short_description": _sentences(rng, rows, 0, 30),
+        "authors": authors[rng.integers(0, len(authors), rows)],
+        "date": dates,
+    })
+
+
+def write_sqlite(df, path):
+    """Write ``df`` as a NewsData table in a SQLite stand-in database."""
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE NewsData (
+            id INTEGER PRIMARY KEY,
+            link TEXT,
+            headline TEXT,
+            category TEXT,
+            short_description TEXT,
+            authors TEXT,
+            date DATE,
+            updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    # Mirrors loader.py's newsdata_touch trigger on Postgres
+    conn.execute('''
+        CREATE TRIGGER newsdata_touch AFTER UPDATE OF link, headline, category, short_description, authors, date
+        ON NewsData BEGIN
+            UPDATE NewsData SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+        END
+    ''')
+    out = df.assign(category=df["category"].astype(str), date=df["date"].dt.strftime("%Y-%m-%d"))
+    conn.executemany(
+        "INSERT INTO NewsData (id, link, headline, category, short_description, authors, date) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        out[["id", "link", "headline", "category", "short_description", "authors", "date"]]
+        .astype(object).itertuples(index=False, name=None),
+    )
+    conn.commit()
+    return conn
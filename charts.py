@@ -0,0 +1,109 @@
+# plotly is imported inside each builder: it is a slow import and pages that
+# draw no chart never need it
+
+# Axis labels shared by every sentiment chart
+LABELS = {"compound": "Average Sentiment Score", "category": "News Category"}
+
+# Decimal places kept for plotted scores; finer values are invisible on screen
+PRECISION = 3
+
+
+def _compact(trend, value):
+    # float32 halves the base64 arrays Plotly embeds for numeric columns
+    out = trend.copy()
+    out[value] = out[value].round(PRECISION).astype("float32")
+    return out
+
+
+def year_lines(trend, value="compound"):
+    """One line per year across categories."""
+    import plotly.express as px
+    return px.line(
+        _compact(trend, value), x="category", y=value, color="year", markers=True,
+        title="Sentiment Score by Year", labels=LABELS,
+    )
+
+
+def category_bars(trend, year, value="compound"):
+    """Bars per category for a single year; replaces the all-years animation."""
+    import plotly.express as px
+    fig = px.bar(
+        _compact(trend[trend["year"] == year], value), x="category", y=value, color="category",
+        range_y=[-1, 1], title=f"Sentiment Score by Category: {year}", labels=LABELS,
+    )
+    fig.update_layout(
+        xaxis_title="News Category",
+        yaxis_title="Average Sentiment Score",
+        title_x=0.5,
+        showlegend=True
+    )
+    return fig
+
+
+def year_window(trend, years, title, value="compound"):
+    """A line+marker trace for each of ``years`` only."""
+    import plotly.graph_objects as go
+    trend = _compact(trend, value)
+    fig = go.Figure()
+    for year in years:
+        df_year = trend[trend["year"] == year]
+        fig.add_trace(go.Scatter(
+            x=df_year["category"],
+            y=df_year[value],
+            mode='lines+markers',
+            name=str(year)
+        ))
+    fig.update_layout(
+        title=title,
+        xaxis_title="News Category",
+        yaxis_title="Average Sentiment Score",
+        showlegend=True
+    )
+    return fig
+
+
+def single_year(trend, year, value="compound"):
+    """The selected year's scores, picked server-side instead of via a dropdown mask."""
+    return year_window(trend, [year], f"Sentiment Score by Year: {year}", value)
+
+
+# Titles and axis labels of the TrendEngine.rolling columns
+ROLLING_VALUES = {
+    "mean": ("Rolling Mean Sentiment", "Average Sentiment Score"),
+    "ewma": ("Exponentially Weighted Sentiment", "EWMA Sentiment Score"),
+    "count": ("Rolling Article Volume", "Articles in Window"),
+}
+
+
+def rolling_lines(frame, value="mean"):
+    """One line per category over time from a TrendEngine.rolling frame."""
+    import plotly.express as px
+    title, label = ROLLING_VALUES[value]
+    return px.line(
+        _compact(frame, value), x="date", y=value, color="category",
+        title=title, labels={value: label, "date": "Date", "category": "News Category"},
+    )
+
+
+def top_terms(terms, title):
+    """Horizontal bars of a term table's counts, most frequent at the top."""
+    import plotly.express as px
+    fig = px.bar(
+        terms.iloc[::-1], x="count", y="term", orientation="h", title=title,
+        labels={"count": "Occurrences in Headlines", "term": "Term"},
+    )
+    fig.update_layout(height=max(400, 20 * len(terms)))
+    return fig
+
+
+def word_cloud(terms, width=800, height=400):
+    """Word cloud image drawn straight from a term table's counts."""
+    from wordcloud import WordCloud
+    frequencies = dict(zip(terms["term"], terms["count"].astype(int)))
+    cloud = WordCloud(width=width, height=height, background_color="white")
+    return cloud.generate_from_frequencies(frequencies).to_array()
+
+
+def payload_bytes(fig):
+    # Size of the JSON Streamlit sends to the browser for this figure
+    return len(fig.to_json())
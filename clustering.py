@@ -0,0 +1,80 @@
+import os
+
+import joblib
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.metrics import silhouette_score
+
+
+class HeadlineClusterer:
+    """Mini-batch k-means over hashed headline features.
+
+    The HashingVectorizer is stateless, so the model can be trained chunk by
+    chunk with ``partial_fit`` and new articles can be assigned with
+    ``predict`` without ever refitting on the whole corpus.
+    """
+
+    def __init__(self, n_clusters=5, n_features=2 ** 18, batch_size=4096, random_state=42):
+        self.n_clusters = n_clusters
+        self.vectorizer = HashingVectorizer(n_features=n_features, alternate_sign=False, norm="l2")
+        self.kmeans = MiniBatchKMeans(
+            n_clusters=n_clusters, batch_size=batch_size, random_state=random_state, n_init=3
+        )
+        self.n_seen = 0
+
+    @property
+    def fitted(self):
+        return hasattr(self.kmeans, "cluster_centers_")
+
+    def transform(self, texts):
+        return self.vectorizer.transform(texts)
+
+    def fit(self, texts):
+        self.kmeans.fit(self.transform(texts))
+        self.n_seen = len(texts)
+        return self
+
+    # Fold one chunk into the model; the first chunk needs at least n_clusters rows
+    def partial_fit(self, texts):
+        if len(texts) == 0 or (not self.fitted and len(texts) < self.n_clusters):
+            return self
+        self.kmeans.partial_fit(self.transform(texts))
+        self.n_seen += len(texts)
+        return self
+
+    def predict(self, texts):
+        if len(texts) == 0:
+            return np.empty(0, dtype=np.int32)
+        return self.kmeans.predict(self.transform(texts)).astype(np.int32)
+
+    def save(self, path):
+        tmp = path + ".tmp"
+        joblib.dump(self, tmp)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def load(path):
+        return joblib.load(path)
+
+
+def choose_n_clusters(texts, candidates=range(2, 11), sample_size=10000, random_state=42):
+    """Pick the cluster count with the best silhouette score on a sample of ``texts``."""
+    texts = list(texts)
+    rng = np.random.default_rng(random_state)
+    if len(texts) > sample_size:
+        texts = [texts[i] for i in rng.choice(len(texts), sample_size, replace=False)]
+
+    best_k, best_score = None, -1.0
+    for k in candidates:
+        if k >= len(texts):
+            break
+        model = HeadlineClusterer(n_clusters=k, random_state=random_state).fit(texts)
+        X = model.transform(texts)
+        labels = model.kmeans.labels_
+        if len(set(labels)) < 2:
+            continue
+        score = silhouette_score(X, labels, metric="cosine", random_state=random_state)
+        if score > best_score:
+            best_k, best_score = k, score
+    return best_k, best_score
@@ -0,0 +1,110 @@
+import argparse
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.feather as feather
+
+# Sentiment columns stored as float32
+SCORE_COLUMNS = ["sentiment_score", "neg", "neu", "pos", "compound"]
+
+# Per-field score columns written by pipeline.add_sentiment, e.g. description_neg
+SCORE_SUFFIXES = ("_compound", "_neg", "_neu", "_pos")
+
+# Low-cardinality text columns stored dictionary-encoded
+DICTIONARY_COLUMNS = ["category", "authors"]
+
+# Columns only needed while scoring/clustering; sentiment_score copies compound
+DROP_COLUMNS = ["content_hash", "dup_of", "cleaned_headline", "cleaned_description", "sentiment_score"]
+
+# Raw article text, kept as Arrow-backed strings unless keep_text=False
+TEXT_COLUMNS = ["headline", "short_description"]
+
+
+def arrow_path_for(csv_path):
+    return os.path.splitext(csv_path)[0] + ".arrow"
+
+
+def convert_csv(csv_path, arrow_path=None):
+    """Write a typed, uncompressed Arrow IPC copy of ``csv_path`` and return its path.
+
+    ``date`` becomes a native date32 column, year/month are precomputed,
+    scores are float32 and category/authors are dictionary-encoded. The file
+    is left uncompressed so readers can memory-map it without decoding.
+    """
+    arrow_path = arrow_path or arrow_path_for(csv_path)
+    table = pacsv.read_csv(csv_path)
+    names = table.column_names
+
+    columns = {}
+    for name in names:
+        col = table[name]
+        if name == "date":
+            col = pa.array(pd.to_datetime(col.to_pandas()).dt.date, type=pa.date32())
+        elif name in SCORE_COLUMNS or name.endswith(SCORE_SUFFIXES):
+            col = col.cast(pa.float32())
+        elif name in DICTIONARY_COLUMNS:
+            col = col.cast(pa.string()).dictionary_encode()
+        elif name == "cluster":
+            col = col.cast(pa.int8())
+        columns[name] = col
+
+    if "date" in columns:
+        dates = pd.to_datetime(columns["date"].to_pandas())
+        columns["year"] = pa.array(dates.dt.year, type=pa.int16())
+        columns["month"] = pa.array(dates.dt.month, type=pa.int8())
+
+    typed = pa.table(columns)
+    tmp = arrow_path + ".tmp"
+    feather.write_feather(typed, tmp, compression="uncompressed")
+    os.replace(tmp, arrow_path)
+    return arrow_path
+
+
+def compact_articles(df, keep_text=True):
+    """Enforce the compact in-memory schema on a scored article frame.
+
+    Drops DROP_COLUMNS, makes scores float32, cluster the narrowest integer
+    and category/authors categoricals. Raw text becomes Arrow-backed strings,
+    or is dropped entirely with ``keep_text=False``.
+    """
+    if "compound" not in df and "sentiment_score" in df:
+        df = df.rename(columns={"sentiment_score": "compound"})
+    drop = DROP_COLUMNS + ([] if keep_text else TEXT_COLUMNS)
+    df = df.drop(columns=[c for c in drop if c in df])
+
+    for name in df.columns:
+        if name in SCORE_COLUMNS or name.endswith(SCORE_SUFFIXES):
+            df[name] = df[name].astype("float32")
+        elif name in DICTIONARY_COLUMNS:
+            df[name] = df[name].astype("category")
+        elif name in TEXT_COLUMNS:
+            df[name] = df[name].astype("string[pyarrow]")
+        elif name == "cluster" and df[name].notna().all():
+            df[name] = pd.to_numeric(df[name], downcast="integer")
+    return df
+
+
+def load_columnar(csv_path, columns=None):
+    """Read ``columns`` of ``csv_path`` via its memory-mapped Arrow copy.
+
+    The Arrow file is (re)built when it is missing or older than the CSV, so
+    the CSV stays the interchange format.
+    """
+    arrow_path = arrow_path_for(csv_path)
+    if not os.path.exists(arrow_path) or os.path.getmtime(arrow_path) < os.path.getmtime(csv_path):
+        convert_csv(csv_path, arrow_path)
+    table = feather.read_table(arrow_path, columns=list(columns) if columns else None, memory_map=True)
+    return table.to_pandas(date_as_object=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a scored CSV into a typed Arrow file.")
+    parser.add_argument("csv_path", nargs="?", default="output1.csv")
+    args = parser.parse_args()
+    print("Wrote", convert_csv(args.csv_path))
+
+
+if __name__ == "__main__":
+    main()
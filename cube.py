@@ -0,0 +1,161 @@
+import os
+import shutil
+import tempfile
+import uuid
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+import instrument
+
+# Directory holding one parquet file per grain
+CUBE_DIR = os.environ.get("CUBE_DIR", "cube")
+
+# Period keys of each grain, finest first
+GRAINS = {
+    "day": ["date"],
+    "month": ["year", "month"],
+    "year": ["year"],
+}
+
+# Cubes are written sorted by period then category in row groups of this many
+# rows, so the min/max statistics of each group let readers skip whole ranges
+ROW_GROUP_ROWS = 4096
+
+# File in a cube directory recording which version of the source it was built from
+STAMP_FILE = "SOURCE"
+
+
+def _compact(cube):
+    cube["category"] = cube["category"].astype("category")
+    cube["count"] = cube["count"].astype("int32")
+    for col in ("year", "month"):
+        if col in cube:
+            cube[col] = cube[col].astype("int16" if col == "year" else "int8")
+    return cube
+
+
+def build_cubes(df, value="compound"):
+    """Build sum/count cubes of ``value`` per category at day, month and year grain.
+
+    The raw frame is grouped once at day grain; month and year are rolled up
+    from the day cube, since sums and counts are additive.
+    """
+    with instrument.stage("aggregate", rows=len(df)):
+        dates = pd.to_datetime(df["date"]).dt.normalize()
+        day = (
+            df.assign(date=dates, **{value: df[value].astype("float64")})
+            .groupby(["date", "category"], observed=True)[value]
+            .agg(["sum", "count"])
+            .reset_index()
+        )
+        day = day[day["count"] > 0]
+        day["year"] = day["date"].dt.year  # lets get_trend prune day row groups by year
+
+        rollup = day.assign(month=day["date"].dt.month)
+        month = rollup.groupby(["year", "month", "category"], observed=True)[["sum", "count"]].sum().reset_index()
+        year = month.groupby(["year", "category"], observed=True)[["sum", "count"]].sum().reset_index()
+
+    return {"day": _compact(day), "month": _compact(month), "year": _compact(year)}
+
+
+def save_cubes(cubes, cube_dir=CUBE_DIR):
+    os.makedirs(cube_dir, exist_ok=True)
+    for grain, cube in cubes.items():
+        cube = cube.sort_values(GRAINS[grain] + ["category"])
+        tmp = os.path.join(cube_dir, f".{grain}.parquet.tmp")
+        cube.to_parquet(tmp, index=False, row_group_size=ROW_GROUP_ROWS)
+        os.replace(tmp, os.path.join(cube_dir, f"{grain}.parquet"))
+
+
+# Size and modification time of a source file; changes whenever it is rewritten
+def file_stamp(path):
+    st = os.stat(path)
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def read_stamp(cube_dir=CUBE_DIR):
+    try:
+        with open(os.path.join(cube_dir, STAMP_FILE), encoding="utf-8") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+def ensure_cubes(cube_dir=CUBE_DIR, source=None, stamp=None):
+    """Build and save all cubes from ``source()`` unless they exist and are current.
+
+    With a ``stamp`` (see file_stamp) the cubes are also rebuilt when it
+    differs from the one they were built from. A rebuild replaces the whole
+    directory, so the trend state, search index and term table kept beside
+    the cubes are rebuilt from the new source too.
+    """
+    missing = [g for g in GRAINS if not os.path.exists(os.path.join(cube_dir, f"{g}.parquet"))]
+    stale = stamp is not None and read_stamp(cube_dir) != stamp
+    if (missing or stale) and source is not None:
+        # Unique names, so concurrent builds (threads or processes) never share one
+        base = cube_dir.rstrip("/\\")
+        tmp = tempfile.mkdtemp(prefix=os.path.basename(base) + ".tmp", dir=os.path.dirname(os.path.abspath(base)))
+        try:
+            save_cubes(build_cubes(source()), tmp)
+            if stamp is not None:
+                with open(os.path.join(tmp, STAMP_FILE), "w", encoding="utf-8") as f:
+                    f.write(stamp)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        old = f"{base}.old{uuid.uuid4().hex}"
+        try:
+            if os.path.exists(cube_dir):
+                os.replace(cube_dir, old)
+            os.replace(tmp, cube_dir)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)  # another build was swapped in first
+        shutil.rmtree(old, ignore_errors=True)
+    return cube_dir
+
+
+def load_cube(grain, cube_dir=CUBE_DIR, source=None, stamp=None):
+    """Read one grain's cube, building and saving all cubes from ``source()`` if missing or stale."""
+    ensure_cubes(cube_dir, source, stamp)
+    return pd.read_parquet(os.path.join(cube_dir, f"{grain}.parquet"))
+
+
+def available_years(cube_dir=CUBE_DIR):
+    years = pq.read_table(os.path.join(cube_dir, "year.parquet"), columns=["year"]).column("year")
+    return sorted(set(years.to_pylist()))
+
+
+def get_trend(years=None, categories=None, grain="year", value="compound", cube_dir=CUBE_DIR):
+    """Mean ``value`` per period and category, reading only the matching row groups.
+
+    ``years`` and ``categories`` are pushed down to the parquet reader, which
+    skips row groups whose statistics fall outside them, so the cost scales
+    with the requested window rather than the full history.
+    """
+    if grain not in GRAINS:
+        raise ValueError(f"Unknown grain {grain!r}; expected one of {', '.join(GRAINS)}")
+    filters = []
+    if years is not None:
+        filters.append(("year", "in", [int(y) for y in years]))
+    if categories is not None:
+        filters.append(("category", "in", [str(c) for c in categories]))
+    with instrument.stage(f"trend:{grain}") as timer:
+        table = pq.read_table(os.path.join(cube_dir, f"{grain}.parquet"), filters=filters or None)
+        cube = table.to_pandas(date_as_object=False)
+        timer.rows = len(cube)
+    return mean_trend(cube, value)
+
+
+def mean_trend(cube, value="compound", years=None, categories=None):
+    """Average ``value`` per period and category, like groupby(...)[value].mean()."""
+    if years is not None:
+        period_year = cube["year"] if "year" in cube else cube["date"].dt.year
+        cube = cube[period_year.isin(years)]
+    if categories is not None:
+        cube = cube[cube["category"].isin(categories)]
+    keys = (["date"] if "date" in cube else [c for c in ("year", "month") if c in cube]) + ["category"]
+    out = cube[keys].copy()
+    out["category"] = out["category"].astype(str)
+    out[value] = cube["sum"] / cube["count"]
+    return out.sort_values(keys).reset_index(drop=True)
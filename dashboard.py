@@ -0,0 +1,78 @@
+"""Cached queries and figures shared by the Streamlit entry points.
+
+Every helper takes the app's data source (a DataStore or ServiceClient, see
+service.connect) as ``_data``, which Streamlit leaves out of the cache key,
+and the data ``version``, which is in it: results are cached per snapshot, so
+a new one behind the service is picked up and old entries age out.
+"""
+from datetime import date
+
+import streamlit as st
+
+import charts
+
+
+# --- Load aggregates ---
+@st.cache_data(max_entries=64)
+def load_trend(_data, version, grain="year", years=None, categories=None):
+    return _data.trend(grain, years, categories)
+
+@st.cache_data(max_entries=2)
+def load_years(_data, version):
+    return _data.info()["years"]
+
+# --- Build figures ---
+# Each figure is built from only the years it draws and cached per argument set
+@st.cache_data(max_entries=2)
+def all_years_chart(_data, version):
+    return charts.year_lines(load_trend(_data, version, "year"))
+
+@st.cache_data(max_entries=64)
+def category_chart(_data, version, year):
+    return charts.category_bars(load_trend(_data, version, "year", years=(year,)), year)
+
+@st.cache_data(max_entries=64)
+def window_chart(_data, version, selected_year, visible_years, top_bottom_years):
+    return charts.year_window(
+        load_trend(_data, version, "year", years=visible_years), visible_years,
+        f"Sentiment Score by Year & Category ({selected_year} ± {top_bottom_years} Years)",
+    )
+
+@st.cache_data(max_entries=64)
+def single_year_chart(_data, version, year):
+    return charts.single_year(load_trend(_data, version, "year", years=(year,)), year)
+
+# --- Rolling trends ---
+@st.cache_data(max_entries=2)
+def trend_span(_data, version):
+    span = _data.trend_range()
+    busiest = _data.window().nlargest(5, "count")["category"].tolist()
+    return date.fromisoformat(span["first"]), date.fromisoformat(span["last"]), span["categories"], busiest
+
+@st.cache_data(max_entries=64)
+def rolling_chart(_data, version, window, start, end, categories, value):
+    frame = _data.rolling(window, start, end, list(categories))
+    return charts.rolling_lines(frame, value)
+
+# --- Search ---
+@st.cache_data(max_entries=2)
+def search_span(_data, version):
+    span = _data.search_range()
+    return date.fromisoformat(span["first"]), date.fromisoformat(span["last"]), span["categories"]
+
+@st.cache_data(max_entries=256)
+def search_articles(_data, version, query, categories, start, end):
+    return _data.search(query, k=50, categories=categories, start=start, end=end)
+
+# --- Top terms ---
+@st.cache_data(max_entries=2)
+def term_groups(_data, version):
+    return _data.term_groups()
+
+@st.cache_data(max_entries=256)
+def group_terms(_data, version, by, group, n):
+    return _data.terms(by, group, n)
+
+@st.cache_data(max_entries=64)
+def cloud_image(_data, version, by, group):
+    return charts.word_cloud(group_terms(_data, version, by, group, 200))
@@ -0,0 +1,203 @@
+import contextlib
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+
+# RDS Credentials, taken from the environment (PG* names work too). There is
+# no default host, so nothing connects to production unless told to
+DB_HOST = os.environ.get("DB_HOST", os.environ.get("PGHOST"))
+DB_PORT = int(os.environ.get("DB_PORT", os.environ.get("PGPORT", "5432")))
+DB_NAME = os.environ.get("DB_NAME", os.environ.get("PGDATABASE", "final_data"))
+DB_USER = os.environ.get("DB_USER", os.environ.get("PGUSER", "pgadmin"))
+DB_PASSWORD = os.environ.get("DB_PASSWORD", os.environ.get("PGPASSWORD"))
+
+# Point at a SQLite file to use it as a local stand-in for Postgres
+DB_SQLITE_PATH = os.environ.get("DB_SQLITE_PATH")
+
+# Pool bounds; callers wait up to DB_POOL_TIMEOUT seconds for a free connection
+DB_POOL_MIN = int(os.environ.get("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.environ.get("DB_POOL_MAX", "8"))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "30"))
+
+# Seconds a query result stays cached, and how many results are kept
+QUERY_CACHE_TTL = float(os.environ.get("QUERY_CACHE_TTL", "300"))
+QUERY_CACHE_SIZE = 128
+
+# Columns query_articles() may project or filter on
+ARTICLE_COLUMNS = ["id", "link", "headline", "category", "short_description", "authors", "date"]
+
+
+# psycopg2 connection arguments; database overrides DB_NAME
+def _pg_params(database=None):
+    if not DB_HOST:
+        raise RuntimeError("Set DB_HOST (or PGHOST) to the Postgres host, or DB_SQLITE_PATH for a local stand-in")
+    return dict(host=DB_HOST, port=DB_PORT, database=database or DB_NAME, user=DB_USER, password=DB_PASSWORD)
+
+
+def connect(database=None):
+    if DB_SQLITE_PATH:
+        return sqlite3.connect(DB_SQLITE_PATH, check_same_thread=False)
+    return psycopg2.connect(**_pg_params(database))
+
+
+class _SQLitePool:
+    """Minimal getconn/putconn pool over a SQLite file, mirroring psycopg2's pools."""
+
+    def __init__(self, maxconn, path):
+        self.path = path
+        self.idle = queue.LifoQueue(maxconn)
+
+    def getconn(self):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            return sqlite3.connect(self.path, check_same_thread=False)
+
+    def putconn(self, conn, close=False):
+        if close:
+            conn.close()
+            return
+        try:
+            self.idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def closeall(self):
+        while not self.idle.empty():
+            self.idle.get_nowait().close()
+
+
+_pool = None
+_pool_slots = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool, _pool_slots
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                if DB_SQLITE_PATH:
+                    pool = _SQLitePool(DB_POOL_MAX, DB_SQLITE_PATH)
+                else:
+                    pool = ThreadedConnectionPool(DB_POOL_MIN, DB_POOL_MAX, **_pg_params())
+                _pool_slots = threading.BoundedSemaphore(DB_POOL_MAX)
+                _pool = pool
+    return _pool
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+
+
+@contextlib.contextmanager
+def connection(timeout=DB_POOL_TIMEOUT):
+    """Borrow a pooled connection, waiting while all DB_POOL_MAX are in use.
+
+    Whatever the caller left uncommitted is rolled back on return, so commit
+    explicitly when writing.
+    """
+    pool = get_pool()
+    if not _pool_slots.acquire(timeout=timeout):
+        raise TimeoutError(f"No database connection free after {timeout}s")
+    conn = None
+    try:
+        conn = pool.getconn()
+        yield conn
+    finally:
+        if conn is not None:
+            broken = False
+            try:
+                conn.rollback()
+            except Exception:
+                broken = True  # don't hand a dead connection to the next caller
+            pool.putconn(conn, close=broken)
+        _pool_slots.release()
+
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+def read_sql(sql, params=(), ttl=QUERY_CACHE_TTL):
+    """Run a read query through the pool, caching the frame for ``ttl`` seconds.
+
+    Cached frames are shared between callers and must not be modified.
+    """
+    key = (sql, tuple(params))
+    now = time.monotonic()
+    if ttl > 0:
+        with _cache_lock:
+            hit = _cache.get(key)
+            if hit is not None and hit[0] > now:
+                return hit[1]
+
+    with connection() as conn:
+        df = pd.read_sql_query(sql, conn, params=tuple(params))
+
+    if ttl > 0:
+        with _cache_lock:
+            if len(_cache) >= QUERY_CACHE_SIZE:
+                # Drop expired entries first, then the oldest
+                for k in [k for k, (expires, _) in _cache.items() if expires <= now] or [next(iter(_cache))]:
+                    _cache.pop(k, None)
+            _cache[key] = (now + ttl, df)
+    return df
+
+
+# Parameter marker for conn's driver, or for the configured database
+def placeholder(conn=None):
+    if conn is not None:
+        return "?" if isinstance(conn, sqlite3.Connection) else "%s"
+    return "?" if DB_SQLITE_PATH else "%s"
+
+
+def article_query(columns=("date", "category"), start=None, end=None, categories=None):
+    """Build a parameterized, column-projected NewsData query; returns (sql, params).
+
+    ``start`` is inclusive and ``end`` exclusive; both filter on ``date``.
+    """
+    unknown = [c for c in columns if c not in ARTICLE_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown NewsData columns: {unknown}")
+    p = placeholder()
+    where, params = [], []
+    if start is not None:
+        where.append(f"date >= {p}")
+        params.append(str(pd.Timestamp(start).date()))
+    if end is not None:
+        where.append(f"date < {p}")
+        params.append(str(pd.Timestamp(end).date()))
+    if categories is not None:
+        categories = sorted(set(categories))
+        if not categories:
+            where.append("1 = 0")
+        else:
+            where.append(f"category IN ({', '.join(p for _ in categories)})")
+            params.extend(categories)
+
+    sql = f"SELECT {', '.join(columns)} FROM NewsData"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    return sql + " ORDER BY date", params
+
+
+def query_articles(columns=("date", "category"), start=None, end=None, categories=None, ttl=QUERY_CACHE_TTL):
+    """Fetch only ``columns`` of the articles in a date range and category set."""
+    sql, params = article_query(columns, start, end, categories)
+    return read_sql(sql, params, ttl=ttl)
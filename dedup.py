@@ -0,0 +1,134 @@
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import HashingVectorizer
+
+# Persisted near-duplicate index used by the incremental pipeline
+DEDUP_PATH = os.environ.get("DEDUP_PATH", "dedup.joblib")
+
+# Estimated Jaccard similarity of word 1-2 gram shingles at which two headlines count as one story
+DEDUP_THRESHOLD = float(os.environ.get("DEDUP_THRESHOLD", "0.8"))
+
+# Signature length and LSH banding; 8 bands of 8 rows put the candidate
+# S-curve's midpoint near 0.77, just under the threshold
+NUM_PERM = 64
+BANDS = 8
+
+# EMPTY marks texts with no shingles
+EMPTY = np.uint32(2 ** 32 - 1)
+
+_shingler = HashingVectorizer(
+    ngram_range=(1, 2), n_features=2 ** 24, alternate_sign=False, norm=None, binary=True,
+)
+
+
+# Multiply-shift hash parameters: the high 32 bits of a*x + b, a odd
+def _permutations(num_perm, seed=1):
+    rng = np.random.default_rng(seed)
+    a = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64)
+    return a, b
+
+
+def minhash(texts, num_perm=NUM_PERM, chunk_size=4096):
+    """MinHash signatures of cleaned texts as an (n, num_perm) uint32 array."""
+    X = _shingler.transform(texts)
+    a, b = _permutations(num_perm)
+    sig = np.full((X.shape[0], num_perm), EMPTY, dtype=np.uint32)
+    for start in range(0, X.shape[0], chunk_size):
+        part = X[start:start + chunk_size]
+        nonempty = np.flatnonzero(np.diff(part.indptr))
+        if len(nonempty) == 0:
+            continue
+        hashes = ((part.indices.astype(np.uint64)[:, None] * a + b) >> np.uint64(32)).astype(np.uint32)
+        hashes[hashes == EMPTY] -= 1
+        sig[start + nonempty] = np.minimum.reduceat(hashes, part.indptr[nonempty], axis=0)
+    return sig
+
+
+class DedupIndex:
+    """LSH index from headline MinHash bands to the id of each story's first article.
+
+    ``add`` assigns every article to an earlier near-duplicate (within the
+    batch or from previous runs) or makes it a new representative; ``lookup``
+    checks a single text without changing the index.
+    """
+
+    def __init__(self, threshold=DEDUP_THRESHOLD, num_perm=NUM_PERM, bands=BANDS):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.tables = [{} for _ in range(bands)]
+        self.rep_ids = []
+        self.signatures = np.empty((0, num_perm), dtype=np.uint32)
+
+    def __len__(self):
+        return len(self.rep_ids)
+
+    def _keys(self, sigs):
+        # One 64-bit key per band; a collision only costs a signature comparison
+        rows = self.num_perm // self.bands
+        mix = _permutations(rows, seed=2)[0]
+        bands = sigs.reshape(len(sigs), self.bands, rows).astype(np.uint64)
+        return (bands * mix).sum(axis=2).tolist()
+
+    def _find(self, sig, keys, pending=()):
+        for table, key in zip(self.tables, keys):
+            pos = table.get(key)
+            if pos is None:
+                continue
+            other = self.signatures[pos] if pos < len(self.signatures) else pending[pos - len(self.signatures)]
+            if np.count_nonzero(other == sig) >= self.threshold * self.num_perm:
+                return pos
+        return None
+
+    def add(self, ids, texts):
+        """Index a batch; returns the representative article id for each row."""
+        ids = np.asarray(ids)
+        # Exact repeats share one signature; only the first of each is indexed
+        codes, uniques = pd.factorize(pd.Series(texts).fillna(""))
+        first = np.full(len(uniques), len(ids))
+        np.minimum.at(first, codes, np.arange(len(ids)))
+        sigs = minhash(uniques, self.num_perm)
+        reps = ids[first]
+        pending = []
+        for i, (sig, keys) in enumerate(zip(sigs, self._keys(sigs))):
+            if sig[0] == EMPTY:
+                continue  # nothing to compare on; the article stands alone
+            pos = self._find(sig, keys, pending)
+            if pos is None:
+                pos = len(self.rep_ids)
+                self.rep_ids.append(reps[i].item())
+                pending.append(sig)
+                for table, key in zip(self.tables, keys):
+                    table.setdefault(key, pos)
+            reps[i] = self.rep_ids[pos]
+        if pending:
+            self.signatures = np.vstack([self.signatures, np.array(pending)])
+        return reps[codes]
+
+    def lookup(self, text):
+        """Id of the indexed near-duplicate of one cleaned text, or None."""
+        sig = minhash([text], self.num_perm)[0]
+        if sig[0] == EMPTY:
+            return None
+        pos = self._find(sig, self._keys(sig[None])[0])
+        return None if pos is None else self.rep_ids[pos]
+
+    def save(self, path=DEDUP_PATH):
+        tmp = path + ".tmp"
+        joblib.dump(self, tmp)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=DEDUP_PATH):
+        return joblib.load(path)
+
+
+# Index at path, or a new empty one
+def load_index(path=DEDUP_PATH):
+    if os.path.exists(path):
+        return DedupIndex.load(path)
+    return DedupIndex()
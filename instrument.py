@@ -0,0 +1,159 @@
+import contextlib
+import cProfile
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+logger = logging.getLogger("senticonomy.metrics")
+
+# Set METRICS_LOG=1 to print one JSON line per stage to stderr
+if os.environ.get("METRICS_LOG") == "1" and not logger.handlers:
+    _handler = logging.StreamHandler(sys.stderr)
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+
+# Prometheus text file rewritten by export_prometheus(); unset disables export
+METRICS_FILE = os.environ.get("METRICS_FILE")
+
+# "cprofile" or "pyinstrument" to capture a profile inside profiled()
+PROFILE = os.environ.get("PROFILE", "")
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+
+_lock = threading.Lock()
+_totals = {}  # stage -> {"calls", "seconds", "rows", "last_seconds", "rss_delta_bytes"}
+
+
+def rss_bytes():
+    """Current resident set size, or 0 where it can't be read cheaply."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        return 0
+
+
+class Timer:
+    """Times one run of a stage; ``stop()`` records it."""
+
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.rows = rows
+        self._rss = rss_bytes()
+        self._start = time.perf_counter()
+
+    def stop(self, rows=None):
+        seconds = time.perf_counter() - self._start
+        rss_delta = rss_bytes() - self._rss
+        if rows is not None:
+            self.rows = rows
+        with _lock:
+            t = _totals.setdefault(self.name, {
+                "calls": 0, "seconds": 0.0, "rows": 0, "last_seconds": 0.0, "rss_delta_bytes": 0,
+            })
+            t["calls"] += 1
+            t["seconds"] += seconds
+            t["rows"] += self.rows or 0
+            t["last_seconds"] = seconds
+            t["rss_delta_bytes"] = rss_delta
+        logger.info(json.dumps({
+            "event": "stage", "stage": self.name, "seconds": round(seconds, 6),
+            "rows": self.rows, "rss_delta_mb": round(rss_delta / 2 ** 20, 2),
+        }))
+        return seconds
+
+
+def start(name, rows=None):
+    return Timer(name, rows)
+
+
+@contextlib.contextmanager
+def stage(name, rows=None):
+    """Time the enclosed block; set ``.rows`` on the yielded timer to count rows."""
+    timer = Timer(name, rows)
+    try:
+        yield timer
+    finally:
+        timer.stop()
+
+
+def totals():
+    with _lock:
+        return {name: dict(t) for name, t in _totals.items()}
+
+
+def reset():
+    with _lock:
+        _totals.clear()
+
+
+_METRICS = [
+    ("calls", "stage_calls_total", "counter", "Times each stage ran."),
+    ("seconds", "stage_seconds_total", "counter", "Wall time spent in each stage."),
+    ("rows", "stage_rows_total", "counter", "Rows processed by each stage."),
+    ("last_seconds", "stage_last_seconds", "gauge", "Wall time of the latest run of each stage."),
+    ("rss_delta_bytes", "stage_rss_delta_bytes", "gauge", "RSS change across the latest run of each stage."),
+]
+
+
+def export_prometheus(path=None):
+    """Write all stage totals to ``path`` in the Prometheus text format."""
+    path = path or METRICS_FILE
+    if not path:
+        return None
+    current = totals()
+    lines = []
+    for key, metric, kind, help_text in _METRICS:
+        lines.append(f"# HELP senticonomy_{metric} {help_text}")
+        lines.append(f"# TYPE senticonomy_{metric} {kind}")
+        for name, t in sorted(current.items()):
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'senticonomy_{metric}{{stage="{label}"}} {t[key]}')
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp, path)
+    return path
+
+
+@contextlib.contextmanager
+def profiled(name, mode=None):
+    """Capture a cProfile or pyinstrument profile of the enclosed block when enabled."""
+    mode = PROFILE if mode is None else mode
+    if not mode:
+        yield None
+        return
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stamp = time.strftime("%Y%m%dT%H%M%S")
+    if mode == "pyinstrument":
+        from pyinstrument import Profiler
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield profiler
+        finally:
+            profiler.stop()
+            path = os.path.join(PROFILE_DIR, f"{name}-{stamp}.html")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(profiler.output_html())
+            print("Profile written to", path)
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield profiler
+        finally:
+            profiler.disable()
+            path = os.path.join(PROFILE_DIR, f"{name}-{stamp}.prof")
+            profiler.dump_stats(path)
+            print("Profile written to", path)
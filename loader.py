@@ -0,0 +1,168 @@
+import argparse
+import io
+import os
+import time
+
+import pandas as pd
+import pyarrow.dataset as ds
+from psycopg2.extras import execute_values
+
+from db import connect
+
+# CSV columns loaded into NewsData, in COPY order
+LOAD_COLUMNS = ["link", "headline", "category", "short_description", "authors", "date"]
+
+# Natural key used to make re-loads idempotent
+NATURAL_KEY = "link"
+
+# NULL as written to the COPY staging CSV. CSV's default NULL is the empty
+# string, which would turn "" into NULL where execute_values keeps it
+COPY_NULL = "\\N"
+
+CREATE_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS NewsData (
+        id SERIAL PRIMARY KEY,
+        link TEXT,
+        headline TEXT,
+        category TEXT,
+        short_description TEXT,
+        authors TEXT,
+        date DATE,
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+'''
+
+# updated_at lets the incremental pipeline hash only rows touched since its
+# last run; the trigger keeps it current for every writer, not just this loader
+ADD_UPDATED_AT_SQL = "ALTER TABLE NewsData ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now()"
+CREATE_TOUCH_SQL = '''
+    CREATE OR REPLACE FUNCTION newsdata_touch() RETURNS trigger AS $$
+    BEGIN
+        NEW.updated_at = now();
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+    DROP TRIGGER IF EXISTS newsdata_touch ON NewsData;
+    CREATE TRIGGER newsdata_touch BEFORE UPDATE ON NewsData
+        FOR EACH ROW EXECUTE FUNCTION newsdata_touch();
+'''
+
+# ON CONFLICT needs a unique index on the natural key; this fails if the
+# table already holds duplicate links, which must be cleaned up first
+CREATE_KEY_SQL = f"CREATE UNIQUE INDEX IF NOT EXISTS newsdata_{NATURAL_KEY}_key ON NewsData ({NATURAL_KEY})"
+
+# Serves the date-range / category filters of db.query_articles
+CREATE_DATE_INDEX_SQL = "CREATE INDEX IF NOT EXISTS newsdata_date_category_idx ON NewsData (date, category)"
+
+_UPDATE_COLUMNS = [c for c in LOAD_COLUMNS if c != NATURAL_KEY]
+
+# Unchanged rows are left alone so their id and tuple stay put
+UPSERT_SUFFIX = f'''
+    ON CONFLICT ({NATURAL_KEY}) DO UPDATE SET
+        {", ".join(f"{c} = EXCLUDED.{c}" for c in _UPDATE_COLUMNS)}
+    WHERE ({", ".join(f"NewsData.{c}" for c in _UPDATE_COLUMNS)})
+        IS DISTINCT FROM ({", ".join(f"EXCLUDED.{c}" for c in _UPDATE_COLUMNS)})
+'''
+
+
+# Normalize one CSV chunk the way upload_csv_to_rds did
+def prepare_chunk(df):
+    df = df.reindex(columns=LOAD_COLUMNS)
+    df["date"] = pd.to_datetime(df["date"], errors="coerce").dt.date
+    missing = df[NATURAL_KEY].isna()
+    if missing.any():
+        # Without a key the upsert can't tell a re-load from a new article
+        print(f"❌ Skipped {int(missing.sum())} rows without a {NATURAL_KEY}")
+        df = df[~missing]
+    # A key may only appear once per INSERT ... ON CONFLICT statement
+    df = df.drop_duplicates(subset=[NATURAL_KEY], keep="last")
+    return df.astype(object).where(pd.notna(df), None)
+
+
+def _copy_chunk(cursor, df):
+    buf = io.StringIO()
+    df.to_csv(buf, index=False, header=False, na_rep=COPY_NULL)
+    buf.seek(0)
+    cursor.execute("TRUNCATE newsdata_stage")
+    cursor.copy_expert(
+        f"COPY newsdata_stage ({', '.join(LOAD_COLUMNS)}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')", buf
+    )
+    cols = ", ".join(LOAD_COLUMNS)
+    cursor.execute(f"INSERT INTO NewsData ({cols}) SELECT {cols} FROM newsdata_stage" + UPSERT_SUFFIX)
+
+
+def _values_chunk(cursor, df, page_size=1000):
+    execute_values(
+        cursor,
+        f"INSERT INTO NewsData ({', '.join(LOAD_COLUMNS)}) VALUES %s" + UPSERT_SUFFIX,
+        list(df.itertuples(index=False, name=None)),
+        page_size=page_size,
+    )
+
+
+# CSV chunks, or record batches of a Parquet file/dataset written by ingest.py
+def read_chunks(path, chunk_size=50000):
+    if os.path.isdir(path) or path.endswith(".parquet"):
+        dataset = ds.dataset(path, format="parquet", partitioning="hive")
+        for batch in dataset.to_batches(columns=LOAD_COLUMNS, batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, encoding="utf-8", chunksize=chunk_size)
+
+
+def load_csv(csv_file_path, conn, method="copy", chunk_size=50000):
+    """Upsert a CSV (or ingest.py Parquet output) into NewsData in chunks; returns (rows, seconds)."""
+    cursor = conn.cursor()
+    cursor.execute(CREATE_TABLE_SQL)
+    cursor.execute(ADD_UPDATED_AT_SQL)
+    cursor.execute(CREATE_TOUCH_SQL)
+    cursor.execute(CREATE_KEY_SQL)
+    cursor.execute(CREATE_DATE_INDEX_SQL)
+    if method == "copy":
+        cursor.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS newsdata_stage "
+            "(LIKE NewsData INCLUDING DEFAULTS) ON COMMIT PRESERVE ROWS"
+        )
+        cursor.execute("ALTER TABLE newsdata_stage DROP COLUMN IF EXISTS id")
+    conn.commit()
+
+    rows, start = 0, time.perf_counter()
+    for chunk in read_chunks(csv_file_path, chunk_size):
+        chunk = prepare_chunk(chunk)
+        if method == "copy":
+            _copy_chunk(cursor, chunk)
+        else:
+            _values_chunk(cursor, chunk)
+        conn.commit()  # one transaction per chunk keeps a failed load resumable
+        rows += len(chunk)
+        elapsed = time.perf_counter() - start
+        print(f" {rows} rows loaded ({rows / max(elapsed, 1e-9):,.0f} rows/sec)")
+
+    cursor.close()
+    return rows, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-load a News Category CSV into NewsData.")
+    parser.add_argument("csv_file_path", nargs="?", default="./outputss.csv",
+                        help="CSV file, or a Parquet dataset written by ingest.py")
+    parser.add_argument("--method", choices=["copy", "values"], default="copy",
+                        help="COPY through a staging table, or execute_values batches")
+    parser.add_argument("--chunk-size", type=int, default=50000)
+    args = parser.parse_args()
+
+    try:
+        conn = connect()
+        print(" Connected to PostgreSQL RDS!")
+        try:
+            rows, seconds = load_csv(args.csv_file_path, conn, method=args.method, chunk_size=args.chunk_size)
+        finally:
+            conn.close()
+        print(f" CSV data uploaded successfully to RDS! {rows} rows in {seconds:.1f}s "
+              f"({rows / max(seconds, 1e-9):,.0f} rows/sec)")
+    except Exception as e:
+        print(" Error:", e)
+
+
+if __name__ == "__main__":
+    main()
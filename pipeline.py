@@ -0,0 +1,465 @@
+import hashlib
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.cluster import KMeans
+from sklearn.pipeline import make_pipeline
+
+import instrument
+import registry
+from clustering import HeadlineClusterer
+from columnar import DROP_COLUMNS, compact_articles
+from dedup import DedupIndex, load_index
+from db import connection, placeholder
+from scoring import SCORE_COLUMNS, score_fields
+from store import ScoreStore
+from terms import build_terms, save_terms
+from textclean import clean_columns
+
+# NLTK resources and fitted models come from the model registry (see train.py),
+# so nothing is downloaded or trained at import time
+
+# Local score store used by the incremental pipeline
+STORE_PATH = os.environ.get("SCORE_STORE_PATH", "scores.db")
+
+# Columns the pipeline and dashboards actually use
+FETCH_COLUMNS = ["id", "headline", "category", "short_description", "authors", "date"]
+
+# Rows per chunk pulled through the server-side cursor
+FETCH_CHUNK_SIZE = int(os.environ.get("FETCH_CHUNK_SIZE", "50000"))
+
+# Changed ids per IN (...) lookup on the SQLite stand-in, far below its bound
+# parameter limit; Postgres takes them as one array parameter
+CHANGED_ID_BATCH = 1000
+
+# "kmeans" is TF-IDF + KMeans; "minibatch" is a HeadlineClusterer trained chunk by
+# chunk. Either way a model registered by train.py is reused instead of refitted
+CLUSTER_BACKEND = os.environ.get("CLUSTER_BACKEND", "kmeans")
+
+# Text fields add_sentiment scores: any of headline, description, combined
+SCORE_FIELDS = [f for f in os.environ.get("SCORE_FIELDS", "headline").split(",") if f]
+
+# Optional weighted blend of fields, e.g. "headline:0.7,description:0.3"
+SCORE_WEIGHTS = {
+    field: float(weight)
+    for field, weight in (p.split(":") for p in os.environ.get("SCORE_WEIGHTS", "").split(",") if p)
+}
+
+# Field whose scores fill compound/neg/neu/pos, which the dashboards plot;
+# "weighted" uses the SCORE_WEIGHTS blend
+SENTIMENT_FIELD = os.environ.get("SENTIMENT_FIELD", "headline")
+
+# Set DEDUP=1 to score and cluster one representative per group of
+# near-duplicate headlines (see dedup.py)
+DEDUP = os.environ.get("DEDUP", "0") == "1"
+
+# Per-cluster and per-category headline term counts written by the clustering
+# stage; worker.py publishes them with each snapshot
+TERMS_PATH = os.environ.get("TERMS_PATH", "terms.parquet")
+
+# Source columns the store keeps; an edit to any of them re-fetches the row
+HASH_COLUMNS = ["headline", "short_description", "category", "authors", "date"]
+
+# Same digest as content_hash(), computed by Postgres so unchanged rows never
+# leave the DB. Dates hash as their ISO text, which both drivers' CASTs give
+HASH_SQL = "md5(" + " || chr(31) || ".join(f"coalesce(CAST({c} AS TEXT), '')" for c in HASH_COLUMNS) + ")"
+
+
+# Connect and fetch data from RDS
+def fetch_data(chunk_size=FETCH_CHUNK_SIZE):
+    try:
+        with connection() as conn:
+            print("✅ Connected to RDS")
+            return fold_chunks(stream_news(conn, chunk_size=chunk_size))
+    except Exception as e:
+        print("❌ Error:", e)
+        return None
+
+
+def fold_chunks(chunks, drop=(), columns=FETCH_COLUMNS):
+    """Concatenate frames as they arrive, holding each one as a compact Arrow table.
+
+    Only the current chunk exists as Python objects; text comes back as
+    Arrow-backed strings instead of one object per value. ``drop`` names
+    columns discarded from every chunk.
+    """
+    tables = []
+    for chunk in chunks:
+        chunk = chunk.drop(columns=[c for c in drop if c in chunk])
+        tables.append(pa.Table.from_pandas(chunk, preserve_index=False))
+    if not tables:
+        return pd.DataFrame(columns=columns)
+    table = pa.concat_tables(tables, promote_options="permissive")
+    return table.to_pandas(types_mapper={pa.string(): pd.StringDtype("pyarrow")}.get)
+
+
+def stream_news(conn, chunk_size=FETCH_CHUNK_SIZE, columns=FETCH_COLUMNS, where=None, params=()):
+    """Yield NewsData rows as DataFrames of at most ``chunk_size`` rows.
+
+    On Postgres this uses a named (server-side) cursor so only one chunk is
+    held client-side at a time. A sqlite3 connection works as a local
+    stand-in; its cursors already step through results lazily.
+    """
+    query = f"SELECT {', '.join(columns)} FROM NewsData"
+    if where:
+        query += f" WHERE {where}"
+    query += " ORDER BY id"
+
+    if isinstance(conn, sqlite3.Connection):
+        cursor = conn.cursor()
+    else:
+        cursor = conn.cursor(name="newsdata_stream")
+        cursor.itersize = chunk_size
+    try:
+        cursor.execute(query, params)
+        while True:
+            with instrument.stage("fetch") as timer:
+                rows = cursor.fetchmany(chunk_size)
+                timer.rows = len(rows)
+            if not rows:
+                break
+            yield pd.DataFrame.from_records(rows, columns=columns)
+    finally:
+        cursor.close()
+
+# Each row's cleaned headline, or its near-duplicate representative's when that
+# article is in the same frame or in ``stored`` (id -> cleaned headline)
+def representative_texts(df, stored=None):
+    if "dup_of" not in df:
+        return df["cleaned_headline"]
+    by_id = pd.Series(df["cleaned_headline"].to_numpy(), index=df["id"].to_numpy())
+    if stored is not None:
+        by_id = pd.concat([by_id, stored])
+    rep_text = df["dup_of"].map(by_id[~by_id.index.duplicated()])
+    return rep_text.fillna(df["cleaned_headline"])
+
+
+# SCORE_FIELDS plus the field behind the dashboard's compound/neg/neu/pos
+def _sentiment_fields():
+    return SCORE_FIELDS + [f for f in [SENTIMENT_FIELD] if f not in SCORE_FIELDS and f != "weighted"]
+
+
+# Prefixed <field>_compound/neg/neu/pos columns add_sentiment writes next to
+# the plain ones; the score store persists them too
+def field_score_columns():
+    fields = _sentiment_fields() + list(SCORE_WEIGHTS) + (["weighted"] if SCORE_WEIGHTS else [])
+    return [f"{f}_{col}" for f in dict.fromkeys(fields) if f != SENTIMENT_FIELD for col in SCORE_COLUMNS]
+
+
+# Stored representatives of near-duplicates whose representative isn't in the frame
+def stored_representatives(store, df):
+    outside = np.setdiff1d(df["dup_of"].to_numpy(np.int64), df["id"].to_numpy(np.int64))
+    return store.rows(outside, ["id", "cleaned_headline", *SCORE_COLUMNS, "cluster"]).set_index("id")
+
+
+# Sentiment Analysis
+def add_sentiment(df, dedup_index=None, store=None):
+    with instrument.stage("clean", rows=len(df)):
+        df = clean_columns(df)  # cleaned_headline + cleaned_description in one pass
+    stored = None
+    if dedup_index is not None:
+        with instrument.stage("dedup", rows=len(df)):
+            df["dup_of"] = dedup_index.add(df["id"], df["cleaned_headline"])
+            if store is not None:
+                stored = stored_representatives(store, df)
+    if SENTIMENT_FIELD == "weighted" and not SCORE_WEIGHTS:
+        raise ValueError("SENTIMENT_FIELD=weighted needs SCORE_WEIGHTS")
+    fields = _sentiment_fields()
+
+    # Near-duplicates of a stored article take its cluster, and its scores too
+    # when only headlines are scored; descriptions are always scored per row
+    reuse = np.zeros(len(df), dtype=bool)
+    if stored is not None and len(stored):
+        rep = stored.reindex(df["dup_of"].to_numpy())
+        df["cluster"] = rep["cluster"].to_numpy()
+        if fields == ["headline"] and not SCORE_WEIGHTS:
+            reuse = rep["compound"].notna().to_numpy()
+
+    with instrument.stage("score", rows=int((~reuse).sum())):
+        # every unique text across all fields is scored once, in one pool
+        scoring = df[~reuse]
+        if "dup_of" in df:
+            texts = representative_texts(df, None if stored is None else stored["cleaned_headline"])
+            scoring = scoring.assign(cleaned_headline=texts[~reuse])
+        scores = score_fields(scoring, fields, weights=SCORE_WEIGHTS or None)
+
+    # The dashboard field keeps the plain names; other fields stay prefixed
+    primary = [f"{SENTIMENT_FIELD}_{col}" for col in SCORE_COLUMNS]
+    values = np.empty((len(df), len(SCORE_COLUMNS)))
+    values[~reuse] = scores[primary].to_numpy()
+    if reuse.any():
+        values[reuse] = rep.loc[reuse, SCORE_COLUMNS].to_numpy(np.float64)
+    df[SCORE_COLUMNS] = values
+    df["sentiment_score"] = df["compound"]
+    for col in scores.columns.drop(primary):
+        df[col] = scores[col]
+    return df
+
+# Fit a fresh cluster model on texts; returns (model, labels)
+def fit_clusterer(texts, num_clusters=5, backend="kmeans", chunk_size=FETCH_CHUNK_SIZE):
+    if backend == "minibatch":
+        model = HeadlineClusterer(n_clusters=num_clusters)
+        with instrument.stage("cluster", rows=len(texts)):  # hashing happens per chunk
+            for i in range(0, len(texts), chunk_size):
+                model.partial_fit(texts.iloc[i:i + chunk_size])
+        return model, predict_clusters(model, texts)
+
+    model = make_pipeline(
+        TfidfVectorizer(max_features=1000),
+        KMeans(n_clusters=num_clusters, random_state=42, n_init=10),
+    )
+    with instrument.stage("vectorize", rows=len(texts)):
+        X = model[:-1].fit_transform(texts)
+    with instrument.stage("cluster", rows=len(texts)):
+        labels = model[-1].fit_predict(X)
+    return model, labels
+
+
+# Assign texts with a fitted TF-IDF+KMeans pipeline or HeadlineClusterer
+def predict_clusters(model, texts):
+    if isinstance(model, HeadlineClusterer):
+        vectorize, kmeans = model.transform, model.kmeans
+    else:
+        vectorize, kmeans = model[:-1].transform, model[-1]
+    if len(texts) == 0:
+        return np.empty(0, dtype=np.int32)
+    with instrument.stage("vectorize", rows=len(texts)):
+        X = vectorize(texts)
+    with instrument.stage("cluster", rows=len(texts)):
+        return kmeans.predict(X).astype(np.int32)
+
+
+# Predict each distinct text once and fan the labels back out
+def predict_unique(model, texts):
+    codes, uniques = pd.factorize(texts)
+    return predict_clusters(model, pd.Series(uniques))[codes]
+
+
+# Clustering
+def add_clusters(df, num_clusters=5, backend="kmeans", refit=False):
+    name = registry.CLUSTER_MODELS[backend]
+    texts = representative_texts(df)
+    if not refit and registry.has(name):
+        df["cluster"] = predict_unique(registry.load_object(name), texts)
+    elif "dup_of" in df:
+        # Fit on one headline per story so repeated stories don't skew the centroids
+        model, _ = fit_clusterer(texts[(df["dup_of"] == df["id"]).to_numpy()], num_clusters, backend)
+        df["cluster"] = predict_unique(model, texts)
+    else:
+        _, df["cluster"] = fit_clusterer(texts, num_clusters, backend)
+    return df
+
+
+# Digest of the HASH_COLUMNS as fetched; matches HASH_SQL
+def content_hash(df):
+    parts = [df[c].map(lambda v: "" if pd.isna(v) else str(v)) for c in HASH_COLUMNS]
+    text = parts[0].str.cat(parts[1:], sep="\x1f")
+    return text.map(lambda s: hashlib.md5(s.encode("utf-8")).hexdigest())
+
+
+# sqlite3 has no md5()/chr(); register them so HASH_SQL runs on the stand-in too
+def _register_sqlite_functions(conn):
+    conn.create_function("md5", 1, lambda s: hashlib.md5(s.encode("utf-8")).hexdigest())
+    conn.create_function("chr", 1, chr)
+
+
+# Whether NewsData has a column, e.g. the updated_at that loader.py maintains
+def _has_column(conn, column):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT * FROM NewsData WHERE 1 = 0")
+        return column in [d[0].lower() for d in cursor.description]
+    finally:
+        cursor.close()
+
+
+# Latest NewsData.updated_at, or None when the table has no such column
+def modified_mark(conn):
+    if not _has_column(conn, "updated_at"):
+        return None
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT MAX(updated_at) FROM NewsData")
+        mark = cursor.fetchone()[0]
+    finally:
+        cursor.close()
+    return None if mark is None else str(mark)
+
+
+# Drop stored articles whose NewsData row is gone; returns how many
+def remove_deleted(store, conn):
+    p = placeholder(conn)
+    source = pd.read_sql_query(f"SELECT id FROM NewsData WHERE id <= {p}", conn, params=(store.watermark(),))
+    gone = np.setdiff1d(store.ids(), source["id"].to_numpy(np.int64))
+    if len(gone):
+        store.delete(gone)
+    return len(gone)
+
+
+def iter_changes(conn, store, chunk_size=FETCH_CHUNK_SIZE, modified_since=None):
+    """Chunks of rows added after the store's watermark, then older rows whose content hash moved.
+
+    With ``modified_since`` (an earlier modified_mark) only rows updated at or
+    after it are hashed; otherwise every row up to the watermark is.
+    """
+    p = placeholder(conn)
+    watermark = store.watermark()
+    yield from stream_news(conn, chunk_size=chunk_size, where=f"id > {p}", params=(watermark,))
+    if len(store) == 0:
+        return
+
+    if isinstance(conn, sqlite3.Connection):
+        _register_sqlite_functions(conn)
+    where, params = f"id <= {p}", (watermark,)
+    if modified_since is not None:
+        where, params = where + f" AND updated_at >= {p}", params + (modified_since,)
+    current = pd.read_sql_query(
+        f"SELECT id, {HASH_SQL} AS content_hash FROM NewsData WHERE {where}", conn, params=params
+    )
+    stored = current["id"].map(store.hashes(current["id"]))
+    changed_ids = current.loc[stored.notna() & (stored != current["content_hash"]), "id"]
+    changed_ids = changed_ids.astype(int).tolist()
+
+    if not changed_ids:
+        return
+    if isinstance(conn, sqlite3.Connection):
+        for i in range(0, len(changed_ids), CHANGED_ID_BATCH):
+            batch = changed_ids[i:i + CHANGED_ID_BATCH]
+            where = f"id IN ({', '.join(p for _ in batch)})"
+            yield from stream_news(conn, chunk_size=chunk_size, where=where, params=tuple(batch))
+    else:
+        yield from stream_news(conn, chunk_size=chunk_size, where="id = ANY(%s)", params=(changed_ids,))
+
+
+# Clean and score each chunk as it arrives
+def iter_scored(chunks, dedup_index=None, store=None):
+    for chunk in chunks:
+        yield add_sentiment(chunk, dedup_index, store)
+
+
+# Score stored cleaned text for per-field columns the store has just gained
+def backfill_scores(store, chunk_size=FETCH_CHUNK_SIZE):
+    columns, store.added_columns = store.added_columns, []
+    corpus = store.load(["id", "cleaned_headline", "cleaned_description"])
+    for i in range(0, len(corpus), chunk_size):
+        part = corpus.iloc[i:i + chunk_size]
+        with instrument.stage("score", rows=len(part)):
+            scores = score_fields(part, _sentiment_fields(), weights=SCORE_WEIGHTS or None)
+        store.update_scores(scores[columns].assign(id=part["id"].to_numpy()))
+    return len(corpus)
+
+
+def update_store(store, conn, num_clusters=5, chunk_size=FETCH_CHUNK_SIZE, backend=CLUSTER_BACKEND):
+    """Fold new, changed and deleted NewsData rows into the store; returns rows scored or removed."""
+    model_name = registry.CLUSTER_MODELS[backend]
+    clusterer = registry.load_object(model_name) if registry.has(model_name) else None
+    if clusterer is None and backend == "minibatch":
+        clusterer = HeadlineClusterer(n_clusters=num_clusters)  # bootstrapped from this run
+    assign_now = clusterer is not None and getattr(clusterer, "fitted", True)
+
+    if store.added_columns and len(store):
+        print(f"✅ Backfilled {', '.join(store.added_columns)} for {backfill_scores(store, chunk_size)} stored articles")
+
+    # Taken before reading so rows updated meanwhile are hashed again next run
+    mark = modified_mark(conn)
+    removed = remove_deleted(store, conn)
+    if removed:
+        print(f"✅ Removed {removed} articles deleted from NewsData")
+
+    dedup_index = load_index() if DEDUP else None
+    scored, max_id = 0, store.watermark()
+    changes = iter_changes(conn, store, chunk_size=chunk_size, modified_since=store.get_meta("modified_mark"))
+    for chunk in iter_scored(changes, dedup_index, store):
+        chunk["content_hash"] = content_hash(chunk)
+        if assign_now:
+            texts = representative_texts(chunk)
+            if "cluster" in chunk:
+                # Rows that took a stored representative's cluster keep it
+                todo = chunk["cluster"].isna()
+                chunk.loc[todo, "cluster"] = predict_unique(clusterer, texts[todo])
+            else:
+                chunk["cluster"] = predict_unique(clusterer, texts)
+        elif clusterer is not None:
+            with instrument.stage("cluster", rows=len(chunk)):
+                clusterer.partial_fit(chunk["cleaned_headline"])
+        store.upsert(chunk)
+        scored += len(chunk)
+        max_id = max(max_id, int(chunk["id"].max()))
+    if mark is not None:
+        store.set_meta("modified_mark", mark)
+    if scored == 0:
+        return removed
+    if dedup_index is not None:
+        dedup_index.save()
+
+    if clusterer is None:
+        # No registered model yet: fit one over the stored cleaned headlines and
+        # register it, so later runs only assign the rows they score
+        corpus = store.load(["id", "cleaned_headline"])
+        model, labels = fit_clusterer(corpus["cleaned_headline"], num_clusters, backend)
+        store.set_clusters(pd.Series(labels, index=corpus["id"]))
+        registry.publish_object(model_name, model)
+    elif not assign_now and clusterer.fitted:
+        # First training pass: label everything stored with the new model
+        for part in store.iter_load(["id", "cleaned_headline"], chunk_size=chunk_size):
+            labels = predict_clusters(clusterer, part["cleaned_headline"])
+            store.set_clusters(pd.Series(labels, index=part["id"]))
+        registry.publish_object(model_name, clusterer)
+
+    store.set_watermark(max_id)
+    return scored + removed
+
+
+# Identifies what the store holds; worker.py skips publishing while it is unchanged
+def store_version(store_path=STORE_PATH):
+    store = ScoreStore(store_path)
+    try:
+        return f"{store.version()}:{store.watermark()}"
+    finally:
+        store.close()
+
+
+# Full Pipeline
+def run_pipeline(incremental=False, store_path=STORE_PATH, chunk_size=FETCH_CHUNK_SIZE):
+    if not incremental:
+        try:
+            with connection() as conn:
+                print("✅ Connected to RDS")
+                # A throwaway index: the incremental pipeline's at DEDUP_PATH
+                # must stay in step with the ids its score store holds
+                dedup_index = DedupIndex() if DEDUP else None
+                # cleaned_description only feeds scoring, so it never accumulates
+                df = fold_chunks(iter_scored(stream_news(conn, chunk_size=chunk_size), dedup_index),
+                                 drop=["cleaned_description"])
+        except Exception as e:
+            print("❌ Error:", e)
+            return None
+        if df.empty:
+            return None
+        df = add_clusters(df, backend=CLUSTER_BACKEND)
+        save_terms(build_terms(df), TERMS_PATH)
+        return compact_articles(df)
+
+    store = ScoreStore(store_path, field_score_columns())
+    try:
+        try:
+            with connection() as conn:
+                print("✅ Connected to RDS")
+                changed = update_store(store, conn, chunk_size=chunk_size)
+            print(f"✅ Updated {changed} new, changed or deleted articles")
+            if changed or not os.path.exists(TERMS_PATH):
+                # Counts are additive, so the stored headlines are summed chunk by chunk
+                columns = ["cleaned_headline", "cluster", "category"]
+                save_terms(build_terms(store.iter_load(columns, chunk_size=chunk_size)), TERMS_PATH)
+        except Exception as e:
+            # Serve whatever was scored last time rather than nothing
+            print("❌ Error:", e)
+        if len(store) == 0:
+            return None
+        return compact_articles(store.load([c for c in store.columns if c not in DROP_COLUMNS]))
+    finally:
+        store.close()
@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from functools import lru_cache
+
+import joblib
+
+# Directory holding versioned model artifacts plus manifest.json
+REGISTRY_DIR = os.environ.get("MODEL_REGISTRY_DIR", "models")
+
+# Registry names of the fitted cluster models, per pipeline backend
+CLUSTER_MODELS = {
+    "kmeans": "tfidf_kmeans",
+    "minibatch": "minibatch_clusterer",
+}
+
+# Clear functions of caches built from registry artifacts in other modules,
+# run after every publish along with the registry's own
+_cache_clearers = []
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def manifest(registry_dir=REGISTRY_DIR):
+    path = os.path.join(registry_dir, "manifest.json")
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def has(name, registry_dir=REGISTRY_DIR):
+    return name in manifest(registry_dir)
+
+
+def publish(name, src_path, registry_dir=REGISTRY_DIR):
+    """Copy ``src_path`` into the registry as the next version of ``name``."""
+    os.makedirs(registry_dir, exist_ok=True)
+    entries = manifest(registry_dir)
+    version = entries.get(name, {}).get("version", 0) + 1
+    filename = f"{name}-v{version}{os.path.splitext(src_path)[1]}"
+    shutil.copyfile(src_path, os.path.join(registry_dir, filename))
+
+    entries[name] = {
+        "version": version,
+        "file": filename,
+        "sha256": _sha256(os.path.join(registry_dir, filename)),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    tmp = os.path.join(registry_dir, "manifest.json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(entries, f, indent=2, sort_keys=True)
+    os.replace(tmp, os.path.join(registry_dir, "manifest.json"))
+    _clear_caches()
+    return entries[name]
+
+
+def publish_object(name, obj, registry_dir=REGISTRY_DIR):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, f"{name}.joblib")
+        joblib.dump(obj, path)
+        return publish(name, path, registry_dir)
+
+
+# Path of the current version of name, checksum-verified on first use
+@lru_cache(maxsize=None)
+def artifact_path(name, registry_dir=REGISTRY_DIR):
+    entry = manifest(registry_dir).get(name)
+    if entry is None:
+        raise KeyError(f"No artifact named {name!r} in {registry_dir}")
+    path = os.path.join(registry_dir, entry["file"])
+    if _sha256(path) != entry["sha256"]:
+        raise RuntimeError(f"Checksum mismatch for {name} v{entry['version']} ({path})")
+    return path
+
+
+@lru_cache(maxsize=None)
+def load_object(name, registry_dir=REGISTRY_DIR):
+    return joblib.load(artifact_path(name, registry_dir))
+
+
+# English stopwords from the registry, falling back to the local NLTK data
+@lru_cache(maxsize=1)
+def stop_words():
+    if has("stopwords"):
+        with open(artifact_path("stopwords"), encoding="utf-8") as f:
+            return frozenset(line.strip() for line in f if line.strip())
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words('english'))
+
+
+# VADER analyzer built from the registry's lexicon, falling back to the local NLTK data
+def vader_analyzer():
+    import nltk.data
+    from nltk.sentiment.vader import SentimentIntensityAnalyzer
+    if not has("vader_lexicon"):
+        return SentimentIntensityAnalyzer()
+    # nltk.data.load only opens files under nltk.data.path, so the registry
+    # directory joins it; versioned file names keep its resource cache apart
+    path = artifact_path("vader_lexicon")
+    root = os.path.dirname(os.path.abspath(path))
+    if root not in nltk.data.path:
+        nltk.data.path.append(root)
+    return SentimentIntensityAnalyzer(lexicon_file=os.path.basename(path))
+
+
+# Have clear() called whenever an artifact is published
+def on_publish(clear):
+    _cache_clearers.append(clear)
+    return clear
+
+
+# Forget cached artifacts so versions published by another process are used
+def reload():
+    _clear_caches()
+
+
+def _clear_caches():
+    artifact_path.cache_clear()
+    load_object.cache_clear()
+    stop_words.cache_clear()
+    for clear in _cache_clearers:
+        clear()
+
@@ -0,0 +1,115 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import registry
+
+# Column order of the score matrix returned by score_texts
+SCORE_COLUMNS = ["compound", "neg", "neu", "pos"]
+
+# Below this many unique texts a process pool costs more than it saves
+MIN_PARALLEL_TEXTS = 20000
+
+# Cleaned column behind each scorable field; "combined" joins both into one text
+FIELD_SOURCES = {
+    "headline": "cleaned_headline",
+    "description": "cleaned_description",
+}
+
+_sia = None
+
+
+# One analyzer per process, built from the registry lexicon on first use
+def _analyzer():
+    global _sia
+    if _sia is None:
+        _sia = registry.vader_analyzer()
+    return _sia
+
+
+# A newly published lexicon takes effect on the next score
+@registry.on_publish
+def _reset_analyzer():
+    global _sia
+    _sia = None
+
+
+# Score a batch of texts into an (n, 4) float64 matrix
+def _score_batch(texts):
+    sia = _analyzer()
+    out = np.empty((len(texts), len(SCORE_COLUMNS)), dtype=np.float64)
+    for i, text in enumerate(texts):
+        scores = sia.polarity_scores(text)
+        out[i] = [scores[col] for col in SCORE_COLUMNS]
+    return out
+
+
+# Score distinct texts in batches, across a process pool for large inputs
+def _score_unique(uniques, workers=None, batch_size=5000):
+    batches = [uniques[i:i + batch_size] for i in range(0, len(uniques), batch_size)]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(batches) < 2 or len(uniques) < MIN_PARALLEL_TEXTS:
+        results = [_score_batch(batch) for batch in batches]
+    else:
+        # Load the lexicon before forking so workers share its pages read-only;
+        # the initializer covers spawn-based platforms
+        _analyzer()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_analyzer) as pool:
+            results = list(pool.map(_score_batch, batches))
+
+    if results:
+        return np.vstack(results)
+    return np.empty((0, len(SCORE_COLUMNS)), dtype=np.float64)
+
+
+def score_texts(texts, workers=None, batch_size=5000):
+    """Score a Series of cleaned texts with VADER.
+
+    Every distinct text is scored exactly once and the results are fanned
+    back out to the original rows. Returns a DataFrame aligned to
+    ``texts.index`` with the columns in ``SCORE_COLUMNS``.
+    """
+    texts = pd.Series(texts)
+    codes, uniques = pd.factorize(texts.fillna(""))
+    unique_scores = _score_unique(list(uniques), workers, batch_size)
+    return pd.DataFrame(unique_scores[codes], index=texts.index, columns=SCORE_COLUMNS)
+
+
+def _field_text(df, field):
+    if field == "combined":
+        parts = [df[col].fillna("") for col in FIELD_SOURCES.values()]
+        return parts[0].str.cat(parts[1:], sep=" ").str.strip()
+    if field not in FIELD_SOURCES:
+        raise ValueError(f"Unknown score field {field!r}; expected one of {[*FIELD_SOURCES, 'combined']}")
+    return df[FIELD_SOURCES[field]].fillna("")
+
+
+def score_fields(df, fields=("headline",), weights=None, workers=None, batch_size=5000):
+    """Score several text fields of a cleaned frame in one pass.
+
+    The texts of all ``fields`` are deduplicated together and scored over a
+    single process pool. Each field gets ``<field>_compound``/``_neg``/
+    ``_neu``/``_pos`` columns. ``weights`` ({field: weight}) adds the same
+    four ``weighted_*`` columns as a weighted mean of those fields.
+    """
+    fields = list(dict.fromkeys(list(fields) + list(weights or {})))
+    texts = [_field_text(df, field) for field in fields]
+    codes, uniques = pd.factorize(pd.concat(texts, ignore_index=True))
+    unique_scores = _score_unique(list(uniques), workers, batch_size)
+
+    out = {}
+    offset = 0
+    for field, field_texts in zip(fields, texts):
+        block = unique_scores[codes[offset:offset + len(field_texts)]]
+        offset += len(field_texts)
+        for j, col in enumerate(SCORE_COLUMNS):
+            out[f"{field}_{col}"] = block[:, j]
+
+    if weights:
+        total = sum(weights.values())
+        for col in SCORE_COLUMNS:
+            out[f"weighted_{col}"] = sum(w * out[f"{f}_{col}"] for f, w in weights.items()) / total
+    return pd.DataFrame(out, index=df.index)
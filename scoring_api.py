@@ -0,0 +1,334 @@
+"""Score fresh headlines without rerunning the pipeline.
+
+Uses the same clean_text + VADER scoring as add_sentiment and the registered
+cluster model, behind a bounded LRU cache keyed by normalized text:
+
+    python scoring_api.py --port 8766
+
+    POST /score  {"texts": ["...", ...]}   -> [{"compound": ..., "cluster": ...}, ...]
+    GET  /score?text=...                   -> {"compound": ..., "cluster": ...}
+    GET  /stats                            -> cache hit rate and batch sizes
+
+Single-text requests that arrive together are micro-batched into one
+scoring call.
+"""
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+import numpy as np
+import pandas as pd
+
+import instrument
+import registry
+from pipeline import CLUSTER_BACKEND, predict_clusters
+from scoring import SCORE_COLUMNS, score_texts
+from service import SERVICE_HOST, HttpService, UnknownRoute
+from textclean import WHITESPACE, clean_series, clean_text
+
+SCORING_PORT = int(os.environ.get("SCORING_PORT", "8766"))
+SCORING_URL = os.environ.get("SCORING_URL", f"http://127.0.0.1:{SCORING_PORT}")
+
+# Distinct normalized texts whose results are kept
+SCORE_CACHE_SIZE = int(os.environ.get("SCORE_CACHE_SIZE", "100000"))
+
+# Single-text requests are gathered for up to this long, or this many texts
+SCORE_BATCH_WAIT_MS = float(os.environ.get("SCORE_BATCH_WAIT_MS", "5"))
+SCORE_MAX_BATCH = int(os.environ.get("SCORE_MAX_BATCH", "512"))
+
+# Micro-batches smaller than this are cleaned text by text; clean_series only
+# pays off once its per-call regex setup is spread over enough texts
+MIN_VECTORIZED_TEXTS = 256
+
+# Seconds between registry checks for a newly published model or lexicon
+SCORE_REGISTRY_POLL = float(os.environ.get("SCORE_REGISTRY_POLL", "5"))
+
+# Registry artifacts besides the cluster model that shape every result
+SCORING_ARTIFACTS = ("vader_lexicon", "stopwords")
+
+# Columns of every scored result
+RESULT_COLUMNS = SCORE_COLUMNS + ["cluster"]
+
+
+def normalize(text):
+    # clean_text lower-cases and collapses whitespace first, so texts that only
+    # differ there clean, score and cluster identically and can share an entry
+    if pd.isnull(text):
+        return ""
+    return WHITESPACE.sub(" ", str(text)).strip().lower()
+
+
+class ResultCache:
+    """Thread-safe bounded LRU of normalized text -> result row, with hit counts."""
+
+    def __init__(self, max_size=SCORE_CACHE_SIZE):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def get_many(self, keys):
+        """Cached rows, None where missing. A text repeated within the batch is
+        only computed once, so only its first occurrence counts as a miss."""
+        out, missing = [], set()
+        with self._lock:
+            for key in keys:
+                row = self._items.get(key)
+                if row is None:
+                    missing.add(key)
+                else:
+                    self._items.move_to_end(key)
+                out.append(row)
+            self.misses += len(missing)
+            self.hits += len(keys) - len(missing)
+        return out
+
+    def put_many(self, keys, rows):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            for key, row in zip(keys, rows):
+                self._items[key] = row
+                self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"size": len(self), "max_size": self.max_size, "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+class Scorer:
+    """Sentiment scores and cluster ids for raw headlines.
+
+    Only texts missing from the cache are cleaned, scored and clustered, once
+    per distinct normalized text and as one vectorized batch. ``cluster`` is
+    -1 when no cluster model has been registered (see train.py).
+
+    At most every ``poll`` seconds a batch checks the registry manifest; when
+    train.py has published a new cluster model (unless one was passed in),
+    lexicon or stopword list, it is loaded and the cache is emptied.
+    """
+
+    def __init__(self, cache_size=SCORE_CACHE_SIZE, backend=CLUSTER_BACKEND, model=None,
+                 poll=SCORE_REGISTRY_POLL):
+        self.cache = ResultCache(cache_size)
+        self.poll = poll
+        self.name = None if model is not None else registry.CLUSTER_MODELS[backend]
+        self.model = model
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._checked = time.monotonic()
+        self._artifacts = self._registered()
+        if self.name in self._artifacts:
+            self.model = registry.load_object(self.name)
+
+    # Checksums of the registered artifacts results depend on
+    def _registered(self):
+        entries = registry.manifest()
+        names = SCORING_ARTIFACTS + ((self.name,) if self.name else ())
+        return {n: entries[n]["sha256"] for n in names if n in entries}
+
+    def _refresh(self):
+        with self._lock:
+            now = time.monotonic()
+            if now - self._checked < self.poll:
+                return
+            self._checked = now
+            artifacts = self._registered()
+            if artifacts == self._artifacts:
+                return
+            registry.reload()
+            if self.name:
+                self.model = registry.load_object(self.name) if self.name in artifacts else None
+            self._artifacts = artifacts
+            self._generation += 1
+            self.cache.clear()
+
+    def score(self, texts):
+        """Score a batch; returns a DataFrame of RESULT_COLUMNS aligned to ``texts``."""
+        self._refresh()
+        generation = self._generation
+        keys = [normalize(t) for t in texts]
+        with instrument.stage("score_api", rows=len(keys)):
+            rows = self.cache.get_many(keys)
+            missing = list(dict.fromkeys(k for k, row in zip(keys, rows) if row is None))
+            if missing:
+                fresh = dict(zip(missing, self._compute(missing)))
+                if generation == self._generation:  # not computed with a replaced model
+                    self.cache.put_many(missing, fresh.values())
+                rows = [fresh[k] if row is None else row for k, row in zip(keys, rows)]
+        values = np.array(rows, dtype=np.float64).reshape(len(rows), len(RESULT_COLUMNS))
+        out = pd.DataFrame(values[:, :-1], columns=SCORE_COLUMNS)
+        out["cluster"] = values[:, -1].astype(np.int32)
+        return out
+
+    def score_one(self, text):
+        return self.score([text]).to_dict("records")[0]
+
+    def _compute(self, texts):
+        if len(texts) < MIN_VECTORIZED_TEXTS:
+            cleaned = pd.Series([clean_text(t) for t in texts], dtype=object)
+        else:
+            cleaned = clean_series(pd.Series(texts, dtype=object))
+        scores = score_texts(cleaned, workers=1).to_numpy()
+        if self.model is not None:
+            clusters = predict_clusters(self.model, cleaned)
+        else:
+            clusters = np.full(len(texts), -1, dtype=np.int32)
+        return [(*map(float, s), int(c)) for s, c in zip(scores, clusters)]
+
+    def stats(self):
+        return self.cache.stats()
+
+
+class MicroBatcher:
+    """Gathers concurrent single-text requests into one Scorer.score call.
+
+    A batch is flushed ``max_wait_ms`` after its first text arrives, or as
+    soon as it holds ``max_batch`` texts. Scoring runs in the default thread
+    pool so the event loop keeps accepting requests meanwhile.
+    """
+
+    def __init__(self, scorer, max_wait_ms=SCORE_BATCH_WAIT_MS, max_batch=SCORE_MAX_BATCH):
+        self.scorer = scorer
+        self.max_wait = max_wait_ms / 1000
+        self.max_batch = max_batch
+        self.pending = []
+        self._flush_handle = None
+        self.batches = 0
+        self.batched_texts = 0
+
+    async def score(self, text):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((text, future))
+        if len(self.pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self.pending = self.pending, []
+        if not batch:
+            return
+        self.batches += 1
+        self.batched_texts += len(batch)
+        task = asyncio.get_running_loop().run_in_executor(None, self.scorer.score, [t for t, _ in batch])
+        task.add_done_callback(lambda done: self._resolve(batch, done))
+
+    @staticmethod
+    def _resolve(batch, done):
+        error = done.exception()
+        records = None if error else done.result().to_dict("records")
+        for i, (_, future) in enumerate(batch):
+            if future.done():
+                continue  # the client gave up
+            if error:
+                future.set_exception(error)
+            else:
+                future.set_result(records[i])
+
+    def stats(self):
+        return {"batches": self.batches,
+                "mean_batch": self.batched_texts / self.batches if self.batches else 0.0}
+
+
+class ScoringService(HttpService):
+    """HTTP front end for a Scorer; batch calls go straight through, single ones are micro-batched."""
+
+    name = "Scoring service"
+
+    def __init__(self, scorer, max_wait_ms=SCORE_BATCH_WAIT_MS, max_batch=SCORE_MAX_BATCH):
+        self.scorer = scorer
+        self.batcher = MicroBatcher(scorer, max_wait_ms, max_batch)
+
+    async def respond(self, method, path, params, body):
+        if path == "/stats":
+            stats = {"cache": self.scorer.stats(), "micro_batches": self.batcher.stats()}
+            return "application/json", json.dumps(stats).encode()
+        if path != "/score":
+            raise UnknownRoute(path)
+        if method == "POST":
+            payload = json.loads(body or b"{}")
+            texts = payload.get("texts") if isinstance(payload, dict) else None
+            if not isinstance(texts, list):
+                raise ValueError('Expected a JSON body {"texts": [...]}')
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(None, self.scorer.score, texts)
+            return "application/json", result.to_json(orient="records").encode()
+        if method == "GET":
+            texts = params.get("text")
+            if not texts:
+                raise ValueError("Missing text parameter")
+            return "application/json", json.dumps(await self.batcher.score(texts[0])).encode()
+        raise ValueError(f"Unsupported method {method}")
+
+
+class ScoringClient:
+    """Calls a running ScoringService."""
+
+    def __init__(self, url=SCORING_URL, timeout=30):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _call(self, path, data=None):
+        request = Request(f"{self.url}{path}", data=data, headers={"Content-Type": "application/json"})
+        try:
+            with urlopen(request, timeout=self.timeout) as resp:
+                return json.loads(resp.read())
+        except HTTPError as e:
+            raise RuntimeError(f"Scoring service error {e.code}: {e.read().decode(errors='replace')}") from None
+
+    def score(self, texts):
+        records = self._call("/score", json.dumps({"texts": list(texts)}).encode())
+        return pd.DataFrame(records, columns=RESULT_COLUMNS)
+
+    def score_one(self, text):
+        return self._call("/score?" + urlencode({"text": text}))
+
+    def stats(self):
+        return self._call("/stats")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve headline sentiment scores over HTTP.")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SCORING_PORT)
+    parser.add_argument("--cache-size", type=int, default=SCORE_CACHE_SIZE)
+    parser.add_argument("--backend", choices=sorted(registry.CLUSTER_MODELS), default=CLUSTER_BACKEND)
+    args = parser.parse_args()
+
+    try:
+        scorer = Scorer(args.cache_size, args.backend)
+        if scorer.model is None:
+            print("❌ No registered cluster model; clusters will be -1 (run `python train.py clusters`)")
+        asyncio.run(ScoringService(scorer).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print("❌ Error:", e)
+
+
+if __name__ == "__main__":
+    main()
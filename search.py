@@ -0,0 +1,126 @@
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+import instrument
+
+# Directory name of the index inside a snapshot or cube directory
+SEARCH_DIR = "search"
+
+# Article columns kept with the index to render hits
+DOC_COLUMNS = ["id", "date", "category", "headline", "compound"]
+
+# days.npy value of articles without a date; date filters never match it
+NO_DAY = np.iinfo(np.int32).min
+
+
+def _day(value):
+    return int(pd.Timestamp(value).to_datetime64().astype("datetime64[D]").astype(np.int64))
+
+
+def _texts(df):
+    parts = [df[c].fillna("").astype(str) for c in ("headline", "short_description") if c in df]
+    return parts[0].str.cat(parts[1:], sep=" ") if len(parts) > 1 else parts[0]
+
+
+def build_index(df, index_dir):
+    """Fit TF-IDF over headline + description and write a memory-mappable index.
+
+    The matrix is stored transposed (one CSR row of postings per term), so a
+    query only touches the postings of its own terms. Hits are rendered from
+    docs.arrow, a row-aligned copy of DOC_COLUMNS.
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer  # slow import; dashboards only query
+
+    os.makedirs(index_dir, exist_ok=True)
+    with instrument.stage("search_index", rows=len(df)):
+        vectorizer = TfidfVectorizer(stop_words="english", sublinear_tf=True, min_df=2, dtype=np.float32)
+        postings = vectorizer.fit_transform(_texts(df)).T.tocsr()
+        postings.sort_indices()
+
+        dates = pd.to_datetime(df["date"]).to_numpy().astype("datetime64[D]")
+        days = np.where(np.isnat(dates), NO_DAY, dates.astype(np.int64)).astype(np.int32)
+        categories = df["category"].astype("category")
+        np.save(os.path.join(index_dir, "indptr.npy"), postings.indptr.astype(np.int64))
+        np.save(os.path.join(index_dir, "rows.npy"), postings.indices.astype(np.int32))
+        np.save(os.path.join(index_dir, "weights.npy"), postings.data.astype(np.float32))
+        np.save(os.path.join(index_dir, "days.npy"), days)
+        np.save(os.path.join(index_dir, "category_codes.npy"), categories.cat.codes.to_numpy(np.int16))
+        docs = df[[c for c in DOC_COLUMNS if c in df]].reset_index(drop=True)
+        table = pa.Table.from_pandas(docs, preserve_index=False)
+        feather.write_feather(table, os.path.join(index_dir, "docs.arrow"), compression="uncompressed")
+
+        # Written last: ensure_index treats its presence as a complete index
+        joblib.dump(
+            {"vectorizer": vectorizer, "categories": [str(c) for c in categories.cat.categories]},
+            os.path.join(index_dir, "meta.joblib"),
+        )
+    return index_dir
+
+
+class SearchIndex:
+    """Read-only, memory-mapped TF-IDF index answering top-k cosine queries."""
+
+    def __init__(self, index_dir):
+        meta = joblib.load(os.path.join(index_dir, "meta.joblib"))
+        self.vectorizer = meta["vectorizer"]
+        self.categories = meta["categories"]
+        load = lambda name: np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode="r")
+        self.indptr = load("indptr")
+        self.rows = load("rows")
+        self.weights = load("weights")
+        self.days = load("days")
+        self.category_codes = load("category_codes")
+        self.docs = feather.read_table(os.path.join(index_dir, "docs.arrow"), memory_map=True)
+
+    def __len__(self):
+        return len(self.days)
+
+    # First and last day of the dated articles
+    def date_range(self):
+        days = np.asarray(self.days)
+        days = days[days != NO_DAY]
+        return pd.Timestamp(days.min(), unit="D"), pd.Timestamp(days.max(), unit="D")
+
+    def query(self, text, k=20, categories=None, start=None, end=None):
+        """Top ``k`` articles by cosine similarity to ``text``, optionally filtered.
+
+        ``start``/``end`` bound the date inclusively; undated articles only
+        match without either. Returns the matching DOC_COLUMNS plus a
+        ``score`` column, best first.
+        """
+        with instrument.stage("search") as timer:
+            q = self.vectorizer.transform([text])
+            scores = np.zeros(len(self), dtype=np.float32)
+            for term, weight in zip(q.indices, q.data):
+                lo, hi = self.indptr[term], self.indptr[term + 1]
+                scores[self.rows[lo:hi]] += weight * self.weights[lo:hi]
+
+            hits = np.flatnonzero(scores)
+            if categories is not None:
+                wanted = [self.categories.index(c) for c in categories if c in self.categories]
+                hits = hits[np.isin(self.category_codes[hits], wanted)]
+            if start is not None:
+                hits = hits[self.days[hits] >= _day(start)]
+            if end is not None:
+                days = self.days[hits]
+                hits = hits[(days <= _day(end)) & (days != NO_DAY)]
+            if len(hits) > k:
+                hits = hits[np.argpartition(-scores[hits], k)[:k]]
+            hits = hits[np.argsort(-scores[hits], kind="stable")]
+
+            out = self.docs.take(hits).to_pandas(date_as_object=False)
+            out["score"] = scores[hits]
+            timer.rows = len(out)
+        return out
+
+
+def ensure_index(index_dir, source):
+    # Build from source() unless an index is already there
+    if not os.path.exists(os.path.join(index_dir, "meta.joblib")):
+        build_index(source(), index_dir)
+    return SearchIndex(index_dir)
@@ -0,0 +1,440 @@
+"""Shared, read-only data service for the dashboards.
+
+One process holds the latest snapshot's cubes, trend state and search index
+and answers trend and drill-down queries over HTTP, so Streamlit workers stop
+loading and aggregating their own copies:
+
+    python service.py                          # serve snapshots/LATEST on 127.0.0.1:8765
+    python service.py --csv output1.csv        # serve cubes built from a CSV instead
+    DATA_SERVICE_URL=http://127.0.0.1:8765 streamlit run appmain.py
+
+Frames are returned as an Arrow IPC stream (or JSON with ``format=json``).
+Identical queries that arrive while one is being computed share its result.
+"""
+import abc
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from urllib.error import HTTPError
+from urllib.parse import parse_qs, urlencode, urlsplit
+from urllib.request import urlopen
+
+import pandas as pd
+import pyarrow as pa
+
+import instrument
+import search
+import snapshot
+import terms
+import trends
+from columnar import load_columnar
+from cube import CUBE_DIR, available_years, ensure_cubes, file_stamp, get_trend
+
+# Where the service listens; dashboards use it when DATA_SERVICE_URL is set
+SERVICE_HOST = os.environ.get("SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.environ.get("SERVICE_PORT", "8765"))
+DATA_SERVICE_URL = os.environ.get("DATA_SERVICE_URL", "")
+
+# Seconds between checks of the LATEST pointer
+SNAPSHOT_POLL = float(os.environ.get("SNAPSHOT_POLL", "5"))
+
+ARROW_TYPE = "application/vnd.apache.arrow.stream"
+
+
+class DataStore:
+    """Read-only queries over one set of cubes, trend state and search index.
+
+    The trend engine and search index are opened on first use. Every method
+    returns plain values or a DataFrame, so ServiceClient can mirror it.
+    """
+
+    def __init__(self, cube_dir, search_dir=None, articles=None, version="", engine=trends.load_engine):
+        self.cube_dir = cube_dir
+        self.search_dir = search_dir or os.path.join(cube_dir, search.SEARCH_DIR)
+        self.articles = articles  # builds the search index when it is missing
+        self.version = version
+        self._load_engine = engine
+        self._engine = None
+        self._index = None
+        self._lock = threading.Lock()
+
+    def terms_path(self):
+        with self._lock:
+            return terms.ensure_terms(os.path.join(self.cube_dir, terms.TERMS_FILE), source=self.articles)
+
+    def engine(self):
+        with self._lock:
+            if self._engine is None:
+                self._engine = self._load_engine(self.cube_dir)
+            return self._engine
+
+    def index(self):
+        with self._lock:
+            if self._index is None:
+                self._index = search.ensure_index(self.search_dir, source=self.articles)
+            return self._index
+
+    def info(self):
+        return {"version": self.version, "years": [int(y) for y in available_years(self.cube_dir)]}
+
+    def trend(self, grain="year", years=None, categories=None):
+        return get_trend(years=years, categories=categories, grain=grain, cube_dir=self.cube_dir)
+
+    # First and last folded day plus the categories the trend engine knows
+    def trend_range(self):
+        engine = self.engine()
+        return {"first": str(engine.start.date()), "last": str(engine.last_day.date()),
+                "categories": list(engine.categories)}
+
+    def rolling(self, window=30, start=None, end=None, categories=None):
+        return self.engine().rolling(window, start, end, categories)
+
+    def window(self, start=None, end=None, categories=None):
+        return self.engine().window(start, end, categories)
+
+    # Groups with a term table, per grouping
+    def term_groups(self):
+        table = terms.load_terms(self.terms_path())
+        # Cluster ids sort numerically, categories alphabetically
+        return {by: sorted(part["group"].unique().tolist(), key=lambda g: (not g.isdigit(), g.isdigit() and int(g), g))
+                for by, part in table.groupby("by")}
+
+    def terms(self, by="cluster", group=None, n=50):
+        return terms.load_terms(self.terms_path(), by=by, group=group, n=n)
+
+    def search_range(self):
+        first, last = self.index().date_range()
+        return {"first": str(first.date()), "last": str(last.date()), "categories": list(self.index().categories)}
+
+    def search(self, query, k=50, categories=None, start=None, end=None):
+        return self.index().query(query, k=k, categories=categories, start=start, end=end)
+
+
+class SnapshotSource:
+    """DataStore of the latest published snapshot, reopened when LATEST moves."""
+
+    def __init__(self, root=snapshot.SNAPSHOT_ROOT, poll=SNAPSHOT_POLL):
+        self.root = root
+        self.poll = poll
+        self._store = None
+        self._checked = 0.0
+
+    def store(self):
+        now = time.monotonic()
+        if self._store is None or now - self._checked >= self.poll:
+            self._checked = now
+            snapshot_id = snapshot.latest_id(self.root)
+            if snapshot_id is None:
+                self._store = None
+            elif self._store is None or self._store.version != snapshot_id:
+                self._store = DataStore(
+                    snapshot.cube_dir(snapshot_id, self.root), snapshot.search_dir(snapshot_id, self.root),
+                    articles=lambda: snapshot.load_articles(snapshot_id, root=self.root), version=snapshot_id,
+                )
+        return self._store
+
+
+class CsvSource:
+    """DataStore of cubes built from a scored CSV, as app.py and apps.py use.
+
+    The CSV is re-stat'ed every ``poll`` seconds; when it has changed, the
+    cubes and everything kept beside them are rebuilt under a new version.
+    """
+
+    def __init__(self, csv_path="output1.csv", cube_dir=CUBE_DIR, poll=SNAPSHOT_POLL):
+        self.csv_path = csv_path
+        self.cube_dir = cube_dir
+        self.poll = poll
+        self._store = None
+        self._checked = 0.0
+        # Shared across dashboard sessions; one rebuild at a time
+        self._lock = threading.Lock()
+
+    def store(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._store is None or now - self._checked >= self.poll:
+                self._checked = now
+                stamp = file_stamp(self.csv_path)
+                if self._store is None or self._store.version != f"csv:{stamp}":
+                    csv_path = self.csv_path
+                    ensure_cubes(self.cube_dir, stamp=stamp,
+                                 source=lambda: load_columnar(csv_path, columns=["date", "category", "compound"]))
+                    self._store = DataStore(self.cube_dir, articles=lambda: load_columnar(csv_path),
+                                            version=f"csv:{stamp}", engine=trends.refresh)
+            return self._store
+
+
+# --- Wire format ---
+def _encode(value, fmt):
+    if isinstance(value, pd.DataFrame):
+        if fmt == "json":
+            return "application/json", value.to_json(orient="records", date_format="iso").encode()
+        sink = pa.BufferOutputStream()
+        table = pa.Table.from_pandas(value, preserve_index=False)
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return ARROW_TYPE, sink.getvalue().to_pybytes()
+    return "application/json", json.dumps(value).encode()
+
+
+def _decode(body, content_type):
+    if content_type.startswith(ARROW_TYPE):
+        return pa.ipc.open_stream(body).read_all().to_pandas(date_as_object=False)
+    return json.loads(body)
+
+
+# Query string -> keyword arguments. A list parameter sent once as "" is an
+# empty list, which filters everything out; an absent one means no filter.
+def _one(params, name, cast=str, default=None):
+    values = params.get(name)
+    return cast(values[0]) if values and values[0] != "" else default
+
+
+def _many(params, name, cast=str):
+    values = params.get(name)
+    if values is None:
+        return None
+    return [cast(v) for v in values if v != ""]
+
+
+ROUTES = {
+    "/info": lambda store, p: store.info(),
+    "/trend": lambda store, p: store.trend(
+        _one(p, "grain", default="year"), _many(p, "years", int), _many(p, "categories")),
+    "/trend_range": lambda store, p: store.trend_range(),
+    "/rolling": lambda store, p: store.rolling(
+        _one(p, "window", int, 30), _one(p, "start"), _one(p, "end"), _many(p, "categories")),
+    "/window": lambda store, p: store.window(_one(p, "start"), _one(p, "end"), _many(p, "categories")),
+    "/term_groups": lambda store, p: store.term_groups(),
+    "/terms": lambda store, p: store.terms(_one(p, "by", default="cluster"), _one(p, "group"), _one(p, "n", int, 50)),
+    "/search_range": lambda store, p: store.search_range(),
+    "/search": lambda store, p: store.search(
+        _one(p, "q", default=""), _one(p, "k", int, 50), _many(p, "categories"), _one(p, "start"), _one(p, "end")),
+}
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error",
+            503: "Service Unavailable"}
+
+
+class UnknownRoute(LookupError):
+    """Raised by ``respond`` for a path the service doesn't serve."""
+
+
+class NothingPublished(RuntimeError):
+    """Raised while there is no snapshot to serve yet; the only error answered with 503."""
+
+
+class HttpService(abc.ABC):
+    """Minimal asyncio HTTP/1.1 server with keep-alive; subclasses implement ``respond``.
+
+    ``respond`` returns (content type, body bytes). UnknownRoute maps to 404,
+    NothingPublished to 503, ValueError/TypeError to 400 and anything else,
+    including other lookup and runtime errors, to 500.
+    """
+
+    name = "HTTP service"
+
+    @abc.abstractmethod
+    async def respond(self, method, path, params, body):
+        """(content type, body bytes) answering one request."""
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request = await reader.readline()
+                if not request.strip():
+                    break
+                method, target, version = request.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", "0"))
+                payload = await reader.readexactly(length) if length else b""
+
+                url = urlsplit(target)
+                status = 200
+                try:
+                    content_type, body = await self.respond(
+                        method, url.path, parse_qs(url.query, keep_blank_values=True), payload)
+                except UnknownRoute as e:
+                    status, content_type, body = 404, "application/json", json.dumps({"error": f"Unknown path {e}"}).encode()
+                except NothingPublished as e:
+                    status, content_type, body = 503, "application/json", json.dumps({"error": str(e)}).encode()
+                except (ValueError, TypeError) as e:
+                    status, content_type, body = 400, "application/json", json.dumps({"error": str(e)}).encode()
+                except Exception as e:
+                    print("❌ Error:", e)
+                    status, content_type, body = 500, "application/json", json.dumps({"error": str(e)}).encode()
+
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                    f"Content-Type: {content_type}\r\nContent-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            pass  # client went away or sent garbage; nothing to answer
+        finally:
+            writer.close()
+
+    async def serve(self, host=SERVICE_HOST, port=SERVICE_PORT):
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"✅ {self.name} listening on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+class DataService(HttpService):
+    """Answers ROUTES from ``source.store()``.
+
+    Queries run in the default thread pool. Identical in-flight queries (same
+    snapshot, path and parameters) are coalesced onto one computation.
+    """
+
+    name = "Data service"
+
+    def __init__(self, source):
+        self.source = source
+        self.inflight = {}
+        self.computed = 0
+        self.coalesced = 0
+
+    async def query(self, path, params):
+        # May rebuild cubes (CsvSource), so it stays off the event loop
+        loop = asyncio.get_running_loop()
+        store = await loop.run_in_executor(None, self.source.store)
+        if path == "/metrics":
+            return "application/json", json.dumps({
+                "version": store and store.version, "computed": self.computed,
+                "coalesced": self.coalesced, "inflight": len(self.inflight), "stages": instrument.totals(),
+            }).encode()
+        if path not in ROUTES:
+            raise UnknownRoute(path)
+        if store is None:
+            raise NothingPublished("No data snapshot has been published yet")
+
+        fmt = _one(params, "format", default="arrow")
+        key = (store.version, path, tuple(sorted((k, tuple(v)) for k, v in params.items())))
+        task = self.inflight.get(key)
+        if task is None:
+            task = loop.run_in_executor(None, lambda: _encode(ROUTES[path](store, params), fmt))
+            self.inflight[key] = task
+            task.add_done_callback(lambda _: self.inflight.pop(key, None))
+            self.computed += 1
+        else:
+            self.coalesced += 1
+        # Shielded so one client hanging up doesn't cancel the others' result
+        return await asyncio.shield(task)
+
+    async def respond(self, method, path, params, body):
+        if method != "GET":
+            raise ValueError(f"Unsupported method {method}")
+        return await self.query(path, params)
+
+
+class ServiceClient:
+    """DataStore's query methods answered by a running DataService."""
+
+    def __init__(self, url=DATA_SERVICE_URL, timeout=30):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self._info = None
+
+    def _get(self, path, **params):
+        query = {}
+        for name, value in params.items():
+            if value is None:
+                continue
+            if isinstance(value, (list, tuple)):
+                query[name] = [str(v) for v in value] or [""]
+            else:
+                query[name] = [str(value)]
+        try:
+            with urlopen(f"{self.url}{path}?{urlencode(query, doseq=True)}", timeout=self.timeout) as resp:
+                return _decode(resp.read(), resp.headers.get("Content-Type", ""))
+        except HTTPError as e:
+            error = NothingPublished if e.code == 503 else RuntimeError
+            raise error(f"Data service error {e.code}: {e.read().decode(errors='replace')}") from None
+
+    def info(self):
+        if self._info is None:
+            self._info = self._get("/info")
+        return self._info
+
+    @property
+    def version(self):
+        return self.info()["version"]
+
+    def trend(self, grain="year", years=None, categories=None):
+        return self._get("/trend", grain=grain, years=years, categories=categories)
+
+    def trend_range(self):
+        return self._get("/trend_range")
+
+    def rolling(self, window=30, start=None, end=None, categories=None):
+        return self._get("/rolling", window=window, start=start, end=end, categories=categories)
+
+    def window(self, start=None, end=None, categories=None):
+        return self._get("/window", start=start, end=end, categories=categories)
+
+    def term_groups(self):
+        return self._get("/term_groups")
+
+    def terms(self, by="cluster", group=None, n=50):
+        return self._get("/terms", by=by, group=group, n=n)
+
+    def search_range(self):
+        return self._get("/search_range")
+
+    def search(self, query, k=50, categories=None, start=None, end=None):
+        return self._get("/search", q=query, k=k, categories=categories, start=start, end=end)
+
+
+def connect(local):
+    """Data for one dashboard rerun: the shared service when DATA_SERVICE_URL is set,
+    otherwise ``local()``'s in-process store. Returns None before any data exists
+    or while the service can't be reached; other service errors are raised.
+    """
+    if DATA_SERVICE_URL:
+        client = ServiceClient(DATA_SERVICE_URL)
+        try:
+            client.info()
+        except NothingPublished:
+            return None  # up, but nothing published yet
+        except OSError as e:
+            print("❌ Error:", e)  # unreachable; URLError is an OSError
+            return None
+        return client
+    return local().store()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve dashboard queries from one shared snapshot.")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--csv", default=None, help="serve cubes built from this CSV instead of snapshots")
+    parser.add_argument("--root", default=snapshot.SNAPSHOT_ROOT, help="snapshot root directory")
+    args = parser.parse_args()
+
+    try:
+        source = CsvSource(args.csv) if args.csv else SnapshotSource(args.root)
+        asyncio.run(DataService(source).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print("❌ Error:", e)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import os
+import shutil
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+import search
+import terms
+import trends
+from cube import GRAINS, build_cubes, load_cube, save_cubes
+
+# Directory holding one sub-directory per published snapshot plus a LATEST pointer
+SNAPSHOT_ROOT = os.environ.get("SNAPSHOT_ROOT", "snapshots")
+
+# Snapshots kept on disk after a publish; older ones are removed
+KEEP_SNAPSHOTS = 3
+
+
+def snapshot_path(snapshot_id, root=SNAPSHOT_ROOT):
+    return os.path.join(root, snapshot_id)
+
+
+# Id of the current snapshot, or None before the first publish
+def latest_id(root=SNAPSHOT_ROOT):
+    try:
+        with open(os.path.join(root, "LATEST"), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+# Version of the data a snapshot was built from, as passed to publish()
+def source_version(snapshot_id, root=SNAPSHOT_ROOT):
+    try:
+        with open(os.path.join(snapshot_path(snapshot_id, root), "SOURCE"), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def publish(df, root=SNAPSHOT_ROOT, keep=KEEP_SNAPSHOTS, term_table=None, version=None):
+    """Write ``df`` and its cubes as a new immutable snapshot and point LATEST at it.
+
+    Everything is written under a fresh directory first; readers only see the
+    snapshot once the LATEST pointer is swapped in with os.replace.
+    ``term_table`` holds the clustering stage's term counts; without one they
+    are counted from ``df``'s headlines. ``version`` identifies the source
+    data (see source_version).
+    """
+    snapshot_id = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+    path = snapshot_path(snapshot_id, root)
+    os.makedirs(path)
+    if version is not None:
+        with open(os.path.join(path, "SOURCE"), "w", encoding="utf-8") as f:
+            f.write(version)
+
+    table = pa.Table.from_pandas(df.reset_index(drop=True), preserve_index=False)
+    feather.write_feather(table, os.path.join(path, "articles.arrow"), compression="uncompressed")
+    cubes = build_cubes(df)
+    save_cubes(cubes, cube_dir(snapshot_id, root))
+    previous = latest_id(root)
+    trends.refresh(cube_dir(snapshot_id, root), previous and cube_dir(previous, root), cubes["day"])
+    search.build_index(df, search_dir(snapshot_id, root))
+    if term_table is None:
+        term_table = terms.build_terms(df)
+    terms.save_terms(term_table, terms_path(snapshot_id, root))
+
+    tmp = os.path.join(root, "LATEST.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(snapshot_id)
+    os.replace(tmp, os.path.join(root, "LATEST"))
+
+    _prune(root, keep)
+    return snapshot_id
+
+
+def _prune(root, keep):
+    snapshots = sorted(d for d in os.listdir(root) if os.path.isdir(os.path.join(root, d)))
+    for old in snapshots[:-keep]:
+        shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+
+
+def cube_dir(snapshot_id, root=SNAPSHOT_ROOT):
+    return os.path.join(snapshot_path(snapshot_id, root), "cube")
+
+
+def search_dir(snapshot_id, root=SNAPSHOT_ROOT):
+    return os.path.join(snapshot_path(snapshot_id, root), search.SEARCH_DIR)
+
+
+def terms_path(snapshot_id, root=SNAPSHOT_ROOT):
+    return os.path.join(cube_dir(snapshot_id, root), terms.TERMS_FILE)
+
+
+def load_cubes(snapshot_id, root=SNAPSHOT_ROOT):
+    return {grain: load_cube(grain, cube_dir(snapshot_id, root)) for grain in GRAINS}
+
+
+# Memory-mapped read of selected article columns
+def load_articles(snapshot_id, columns=None, root=SNAPSHOT_ROOT):
+    path = os.path.join(snapshot_path(snapshot_id, root), "articles.arrow")
+    table = feather.read_table(path, columns=list(columns) if columns else None, memory_map=True)
+    return table.to_pandas(date_as_object=False)
@@ -0,0 +1,191 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+# Columns persisted per article, in table order
+STORE_COLUMNS = [
+    "id", "content_hash", "headline", "category", "short_description", "authors", "date",
+    "cleaned_headline", "cleaned_description",
+    "sentiment_score", "neg", "neu", "pos", "compound", "cluster", "dup_of",
+]
+
+# Ids per IN (...) lookup, well under SQLite's bound-variable limit
+ID_BATCH = 500
+
+
+def _batches(ids, size=ID_BATCH):
+    ids = [int(i) for i in ids]
+    for i in range(0, len(ids), size):
+        yield ids[i:i + size]
+
+
+class ScoreStore:
+    """Local SQLite store of computed article scores keyed by NewsData.id.
+
+    ``score_columns`` are extra REAL columns, such as the per-field scores of
+    pipeline.SCORE_FIELDS. Ones an existing store lacks are added with ALTER
+    TABLE and listed in ``added_columns``; stored rows hold NULL there until
+    backfilled.
+    """
+
+    def __init__(self, path="scores.db", score_columns=()):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS articles (
+                id INTEGER PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                headline TEXT,
+                category TEXT,
+                short_description TEXT,
+                authors TEXT,
+                date TEXT,
+                cleaned_headline TEXT,
+                cleaned_description TEXT,
+                sentiment_score REAL,
+                neg REAL,
+                neu REAL,
+                pos REAL,
+                compound REAL,
+                cluster INTEGER,
+                dup_of INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        ''')
+        existing = {row[1] for row in self.conn.execute("PRAGMA table_info(articles)")}
+        self.added_columns = []
+        for col in score_columns:
+            if not col.isidentifier():
+                raise ValueError(f"Invalid score column name {col!r}")
+            if col not in existing:
+                self.added_columns.append(col)
+        with self.conn:
+            if "dup_of" not in existing:
+                self.conn.execute("ALTER TABLE articles ADD COLUMN dup_of INTEGER")
+            for col in self.added_columns:
+                self.conn.execute(f"ALTER TABLE articles ADD COLUMN {col} REAL")
+        self.columns = STORE_COLUMNS + [c for c in score_columns if c not in STORE_COLUMNS]
+
+    def get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    # Highest NewsData.id already folded into the store
+    def watermark(self):
+        return int(self.get_meta("watermark", 0))
+
+    def set_watermark(self, value):
+        self.set_meta("watermark", int(value))
+
+    # Counter bumped by every write to the stored articles
+    def version(self):
+        return int(self.get_meta("version", 0))
+
+    def _bump_version(self):
+        self.conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('version', '1') "
+            "ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+        )
+
+    # id -> content_hash for every stored article, or only for ``ids``
+    def hashes(self, ids=None):
+        if ids is None:
+            return dict(self.conn.execute("SELECT id, content_hash FROM articles").fetchall())
+        out = {}
+        for batch in _batches(ids):
+            out.update(self.conn.execute(
+                f"SELECT id, content_hash FROM articles WHERE id IN ({', '.join('?' for _ in batch)})", batch
+            ).fetchall())
+        return out
+
+    def ids(self):
+        rows = self.conn.execute("SELECT id FROM articles ORDER BY id").fetchall()
+        return np.array([r[0] for r in rows], dtype=np.int64)
+
+    # Stored rows of ``ids``, skipping ones not in the store
+    def rows(self, ids, columns=None):
+        columns = columns or self.columns
+        frames = [
+            pd.read_sql_query(
+                f"SELECT {', '.join(columns)} FROM articles WHERE id IN ({', '.join('?' for _ in batch)})",
+                self.conn, params=batch,
+            )
+            for batch in _batches(ids)
+        ]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    # Insert new articles and overwrite changed ones
+    def upsert(self, df):
+        if df.empty:
+            return
+        df = df.reindex(columns=self.columns)
+        if "date" in df:
+            df["date"] = pd.to_datetime(df["date"]).dt.strftime("%Y-%m-%d")
+        df = df.astype(object).where(pd.notna(df), None)
+        placeholders = ", ".join("?" for _ in self.columns)
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO articles ({', '.join(self.columns)}) VALUES ({placeholders})",
+                df.itertuples(index=False, name=None),
+            )
+            self._bump_version()
+
+    # Remove articles by id, e.g. ones deleted from NewsData
+    def delete(self, ids):
+        if len(ids) == 0:
+            return
+        with self.conn:
+            self.conn.executemany("DELETE FROM articles WHERE id = ?", ((int(i),) for i in ids))
+            self._bump_version()
+
+    # Overwrite some score columns of stored articles from a frame with an id column
+    def update_scores(self, df):
+        if df.empty:
+            return
+        cols = [c for c in df.columns if c != "id"]
+        values = df[cols + ["id"]].astype(object).where(pd.notna(df[cols + ["id"]]), None)
+        with self.conn:
+            self.conn.executemany(
+                f"UPDATE articles SET {', '.join(f'{c} = ?' for c in cols)} WHERE id = ?",
+                values.itertuples(index=False, name=None),
+            )
+            self._bump_version()
+
+    # Overwrite cluster ids from a Series indexed by article id
+    def set_clusters(self, clusters):
+        if clusters.empty:
+            return
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE articles SET cluster = ? WHERE id = ?",
+                ((int(c), int(i)) for i, c in clusters.items()),
+            )
+            self._bump_version()
+
+    def load(self, columns=None):
+        cols = ", ".join(columns or self.columns)
+        df = pd.read_sql_query(f"SELECT {cols} FROM articles ORDER BY id", self.conn)
+        if "date" in df:
+            df["date"] = pd.to_datetime(df["date"])
+        return df
+
+    # Stream stored articles in id order, chunk_size rows at a time
+    def iter_load(self, columns=None, chunk_size=50000):
+        cols = ", ".join(columns or self.columns)
+        yield from pd.read_sql_query(
+            f"SELECT {cols} FROM articles ORDER BY id", self.conn, chunksize=chunk_size
+        )
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,137 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+import instrument
+
+# Term table saved next to the cubes it describes
+TERMS_FILE = "terms.parquet"
+
+# Terms kept per cluster and per category
+TOP_TERMS = int(os.environ.get("TOP_TERMS", "200"))
+
+# Article columns a table is grouped by
+TERM_GROUPS = ("cluster", "category")
+
+
+def _texts(df):
+    # Cleaned headlines where the pipeline kept them; otherwise raw headlines,
+    # which the vectorizer lower-cases and strips of English stop words
+    col = "cleaned_headline" if "cleaned_headline" in df else "headline"
+    return df[col].fillna("").astype(str)
+
+
+def _label(value):
+    # Cluster ids read back as floats when a column had gaps; keep "3", not "3.0"
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class TermCounter:
+    """Headline term frequencies per cluster and per category, summed chunk by chunk.
+
+    Each chunk is tokenized once into a sparse count matrix; multiplying it by
+    a group indicator matrix sums every cluster's (or category's) rows in one
+    product, instead of joining each group's headlines into one string.
+    """
+
+    def __init__(self, groups=TERM_GROUPS):
+        self.groups = [g for g in groups]
+        self.vocab = {}
+        self.labels = {g: {} for g in self.groups}
+        self.totals = {g: None for g in self.groups}
+        self.rows = 0
+
+    def update(self, df):
+        # Imported here so dashboards reading saved tables never load sklearn
+        from scipy import sparse
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        vectorizer = CountVectorizer(stop_words="english")
+        try:
+            X = vectorizer.fit_transform(_texts(df))
+        except ValueError:
+            return self  # no terms in this chunk
+        self.rows += len(df)
+        cols = np.array([self.vocab.setdefault(t, len(self.vocab)) for t in vectorizer.get_feature_names_out()])
+
+        for by in self.groups:
+            if by not in df:
+                continue
+            codes, values = pd.factorize(df[by])
+            labels = self.labels[by]
+            rows = np.array([labels.setdefault(_label(v), len(labels)) for v in values], dtype=np.intp)
+            docs = np.flatnonzero(codes >= 0)
+            indicator = sparse.csr_matrix(
+                (np.ones(len(docs)), (rows[codes[docs]], docs)), shape=(len(labels), X.shape[0]),
+            )
+            sums = (indicator @ X).tocoo()
+            part = sparse.csr_matrix((sums.data, (sums.row, cols[sums.col])), shape=(len(labels), len(self.vocab)))
+            total = self.totals[by]
+            if total is not None:
+                total.resize(part.shape)
+                part = total + part
+            self.totals[by] = part
+        return self
+
+    def table(self, max_terms=TOP_TERMS):
+        """Long frame of by, group, term and count, top ``max_terms`` per group."""
+        terms = np.empty(len(self.vocab), dtype=object)
+        terms[list(self.vocab.values())] = list(self.vocab)
+        frames = []
+        for by, total in self.totals.items():
+            if total is None:
+                continue
+            for label, i in self.labels[by].items():
+                lo, hi = total.indptr[i], total.indptr[i + 1]
+                counts, words = total.data[lo:hi], terms[total.indices[lo:hi]]
+                top = np.lexsort((words, -counts))[:max_terms]
+                frames.append(pd.DataFrame({
+                    "by": by, "group": label, "term": words[top], "count": counts[top].astype(np.int32),
+                }))
+        if not frames:
+            return pd.DataFrame({"by": [], "group": [], "term": [], "count": np.array([], dtype=np.int32)})
+        return pd.concat(frames, ignore_index=True)
+
+
+def build_terms(chunks, max_terms=TOP_TERMS):
+    """Term table of an iterable of article frames (or a single frame)."""
+    if isinstance(chunks, pd.DataFrame):
+        chunks = [chunks]
+    counter = TermCounter()
+    with instrument.stage("terms") as timer:
+        for chunk in chunks:
+            counter.update(chunk)
+        timer.rows = counter.rows
+        return counter.table(max_terms)
+
+
+def save_terms(table, path):
+    tmp = path + ".tmp"
+    table.sort_values(["by", "group", "count", "term"], ascending=[True, True, False, True]).to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def load_terms(path, by=None, group=None, n=None):
+    """Top terms read from a saved table, optionally for one grouping and group."""
+    if by is not None and by not in TERM_GROUPS:
+        raise ValueError(f"Unknown grouping {by!r}; expected one of {', '.join(TERM_GROUPS)}")
+    filters = []
+    if by is not None:
+        filters.append(("by", "==", by))
+    if group is not None:
+        filters.append(("group", "==", str(group)))
+    table = pq.read_table(path, filters=filters or None).to_pandas()
+    if n is not None:
+        table = table.groupby(["by", "group"], sort=False).head(n).reset_index(drop=True)
+    return table
+
+
+# Build and save the table from source() unless it already exists
+def ensure_terms(path, source):
+    if not os.path.exists(path):
+        save_terms(build_terms(source()), path)
+    return path
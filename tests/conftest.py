@@ -0,0 +1,14 @@
+import os
+import sys
+import tempfile
+
+# Modules read their paths from the environment at import time, so point the
+# registry, stores and SQLite stand-in at a scratch directory before any import
+_scratch = tempfile.mkdtemp(prefix="news-tests-")
+os.environ.setdefault("MODEL_REGISTRY_DIR", os.path.join(_scratch, "models"))
+os.environ.setdefault("DB_SQLITE_PATH", os.path.join(_scratch, "news.db"))
+os.environ.setdefault("SCORE_STORE_PATH", os.path.join(_scratch, "scores.db"))
+os.environ.setdefault("TERMS_PATH", os.path.join(_scratch, "terms.parquet"))
+os.environ.setdefault("DEDUP_PATH", os.path.join(_scratch, "dedup.joblib"))
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
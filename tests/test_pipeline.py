@@ -0,0 +1,40 @@
+import os
+import sqlite3
+
+import pandas as pd
+
+import db
+import pipeline
+from benchmarks.synthetic import generate_news, write_sqlite
+from store import ScoreStore
+
+
+def _run(store):
+    with db.connection() as conn:
+        return pipeline.update_store(store, conn, chunk_size=100)
+
+
+def test_update_store_follows_non_text_edits(tmp_path):
+    write_sqlite(generate_news(300), db.DB_SQLITE_PATH).close()
+    store = ScoreStore(str(tmp_path / "scores.db"), pipeline.field_score_columns())
+    try:
+        assert _run(store) == 300
+
+        conn = sqlite3.connect(db.DB_SQLITE_PATH)
+        old = conn.execute("SELECT category FROM NewsData WHERE id = 5").fetchone()[0]
+        new_category = "TECH" if old != "TECH" else "SPORTS"
+        conn.execute("UPDATE NewsData SET category = ?, date = '2012-01-01', authors = 'Someone Else' WHERE id = 5",
+                     (new_category,))
+        conn.commit()
+        conn.close()
+
+        assert _run(store) == 1
+        row = store.load(["id", "category", "date", "authors"]).set_index("id").loc[5]
+        assert row["category"] == new_category
+        assert row["date"] == pd.Timestamp("2012-01-01")
+        assert row["authors"] == "Someone Else"
+        # Nothing left to pick up on the next run
+        assert _run(store) == 0
+    finally:
+        store.close()
+        os.remove(db.DB_SQLITE_PATH)
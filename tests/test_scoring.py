@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+import registry
+import scoring
+
+TEXTS = pd.Series([
+    "great wonderful day", "terrible awful war", "", None, np.nan,
+    "great wonderful day", "not bad at all", "kids love peace", "terrible awful war",
+    "the market fell sharply", "héllo wörld café", "wow!!! so good :)",
+])
+
+
+def _loop(texts):
+    # Per-row scoring as add_sentiment did before score_texts
+    sia = registry.vader_analyzer()
+    rows = [sia.polarity_scores("" if pd.isnull(t) else t) for t in texts]
+    return pd.DataFrame([[r[c] for c in scoring.SCORE_COLUMNS] for r in rows],
+                        index=texts.index, columns=scoring.SCORE_COLUMNS)
+
+
+def test_score_texts_matches_per_row_scores():
+    pd.testing.assert_frame_equal(scoring.score_texts(TEXTS), _loop(TEXTS))
+
+
+def test_score_texts_keeps_index_and_order():
+    texts = TEXTS.set_axis(range(100, 100 + len(TEXTS)))[::-1]
+    pd.testing.assert_frame_equal(scoring.score_texts(texts), _loop(texts))
+
+
+def test_score_texts_matches_across_process_pool(monkeypatch):
+    monkeypatch.setattr(scoring, "MIN_PARALLEL_TEXTS", 0)
+    # Distinct texts spread over several batches, with repeats and nulls between them
+    texts = pd.Series([None if pd.isnull(t) else f"{t} {i % 9}" for i, t in enumerate(list(TEXTS) * 5)])
+    result = scoring.score_texts(texts, workers=2, batch_size=7)
+    pd.testing.assert_frame_equal(result, _loop(texts))
@@ -0,0 +1,39 @@
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+import textclean
+
+TEXTS = pd.Series([
+    "The Market FELL sharply!", "", None, np.nan, "   ",
+    "see https://example.com/a?b=1 and http://x.org/path now", "link:https://t.co/abc,then more",
+    "non\u00a0breaking\u2003em\u3000ideographic\u2028line\x85next",
+    "unit\x1cseparators\x1dgroup\x1erecord\x1funit", "tabs\tand\nnewlines\r\nhere",
+    "don't stop-words: it's the best of them all", "Café déjà vu — naïve 100% résumé",
+    "The Market FELL sharply!", "", "again and again and AGAIN",
+])
+
+
+def test_clean_series_matches_clean_text():
+    expected = TEXTS.apply(textclean.clean_text).astype(object)
+    pd.testing.assert_series_equal(textclean.clean_series(TEXTS), expected)
+
+
+def test_clean_series_keeps_index_and_order():
+    texts = TEXTS.set_axis(range(100, 100 + len(TEXTS)))[::-1]
+    pd.testing.assert_series_equal(textclean.clean_series(texts), texts.apply(textclean.clean_text).astype(object))
+
+
+def test_clean_series_matches_across_process_pool():
+    # Distinct texts spread over several chunks, with repeats and nulls between them
+    texts = pd.Series([None if pd.isnull(t) else f"{t} {i % 9}" for i, t in enumerate(list(TEXTS) * 5)])
+    result = textclean.clean_series(texts, workers=2, chunk_size=7)
+    pd.testing.assert_series_equal(result, texts.apply(textclean.clean_text).astype(object))
+
+
+def test_whitespace_class_is_python_whitespace():
+    cls = re.compile(f"[{textclean._WS}]")
+    matched = {chr(c) for c in range(sys.maxunicode + 1) if cls.match(chr(c))}
+    assert matched == {chr(c) for c in range(sys.maxunicode + 1) if chr(c).isspace()}
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+import trends
+
+
+def _day_cube(seed, days=60, categories=("POLITICS", "SPORTS", "TECH")):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2022-01-01", periods=days, freq="D")
+    cube = pd.DataFrame({
+        "date": np.repeat(dates, len(categories)),
+        "category": np.tile(categories, days),
+        "count": rng.integers(0, 5, days * len(categories)),
+    })
+    cube["sum"] = cube["count"] * rng.uniform(-1, 1, len(cube))
+    return cube[cube["count"] > 0].reset_index(drop=True)
+
+
+def _assert_same(engine, fresh):
+    assert engine.start == fresh.start
+    # Categories added by a refresh are appended, so line columns up by name
+    assert sorted(engine.categories) == sorted(fresh.categories)
+    cols = [fresh.categories.index(c) for c in engine.categories]
+    np.testing.assert_array_equal(engine.cum_count, fresh.cum_count[:, cols])
+    np.testing.assert_allclose(engine.cum_sum, fresh.cum_sum[:, cols])
+    np.testing.assert_allclose(engine.ewma, fresh.ewma[:, cols], equal_nan=True)
+
+
+def _refreshed(tmp_path, before, after):
+    previous, current = tmp_path / "previous", tmp_path / "current"
+    previous.mkdir()
+    current.mkdir()
+    trends.refresh(str(previous), day_cube=before)
+    return trends.refresh(str(current), str(previous), day_cube=after)
+
+
+def _fresh(day_cube):
+    engine = trends.TrendEngine()
+    engine.update(day_cube)
+    return engine
+
+
+def test_refresh_picks_up_rescored_days(tmp_path):
+    before = _day_cube(0)
+    after = before.copy()
+    after.loc[after["date"] == "2022-01-10", "sum"] += 0.5
+    after = pd.concat([after, _day_cube(1, days=70).query("date > '2022-03-01'")], ignore_index=True)
+
+    _assert_same(_refreshed(tmp_path, before, after), _fresh(after))
+
+
+def test_refresh_picks_up_deleted_and_new_categories(tmp_path):
+    before = _day_cube(2)
+    after = before[~((before["date"] == "2022-02-01") & (before["category"] == "SPORTS"))]
+    late = pd.DataFrame({"date": [pd.Timestamp("2022-01-20")], "category": ["ARTS"], "count": [2], "sum": [0.8]})
+    after = pd.concat([after, late], ignore_index=True)
+
+    _assert_same(_refreshed(tmp_path, before, after), _fresh(after))
+
+
+def test_refresh_rebuilds_for_earlier_days(tmp_path):
+    before = _day_cube(3)
+    earlier = _day_cube(4, days=5).assign(date=lambda d: d["date"] - pd.Timedelta(days=5))
+    after = pd.concat([earlier, before], ignore_index=True)
+
+    _assert_same(_refreshed(tmp_path, before, after), _fresh(after))
+
+
+def test_refresh_rebuilds_for_dropped_tail(tmp_path):
+    before = _day_cube(6)
+    after = before[before["date"] < "2022-02-10"]
+
+    _assert_same(_refreshed(tmp_path, before, after), _fresh(after))
+
+
+def test_first_change_is_none_when_nothing_changed():
+    cube = _day_cube(5)
+    assert _fresh(cube).first_change(cube) is None
@@ -0,0 +1,89 @@
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import pandas as pd
+
+import registry
+
+# Every character Python's re treats as \s, spelled out so the vectorized
+# path behaves the same whether pandas runs Python re or pyarrow's RE2
+_WS = "\t\n\x0b\x0c\r\x1c-\x1f \x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000"
+
+LINK_OR_PUNCT = re.compile(rf"https?://[^{_WS}]+|[^a-zA-Z{_WS}]")
+WHITESPACE = re.compile(rf"[{_WS}]+")
+
+# Fields cleaned by the pipeline and the columns they land in
+TEXT_FIELDS = {
+    "headline": "cleaned_headline",
+    "short_description": "cleaned_description",
+}
+
+
+def stop_words():
+    return registry.stop_words()
+
+
+# After punctuation is stripped only purely alphabetic stopwords can still match
+@lru_cache(maxsize=1)
+def _stopword_pattern():
+    words = sorted((w for w in stop_words() if w.isalpha()), key=len, reverse=True)
+    return re.compile(r"\b(?:" + "|".join(words) + r")\b")
+
+
+registry.on_publish(_stopword_pattern.cache_clear)
+
+
+# Clean a single text; reference behaviour for clean_series
+def clean_text(text):
+    if pd.isnull(text):
+        return ""
+    text = text.lower()
+    text = LINK_OR_PUNCT.sub('', text)  # remove links, punctuation
+    text = WHITESPACE.sub(' ', text).strip()  # remove extra spaces
+    sw = stop_words()
+    return " ".join(word for word in text.split() if word not in sw)
+
+
+# Vectorized clean of an already-deduplicated Series
+def _clean_unique(texts):
+    texts = pd.Series(texts, dtype=object).fillna("").astype(str)
+    texts = texts.str.lower()
+    texts = texts.str.replace(LINK_OR_PUNCT.pattern, "", regex=True)
+    texts = texts.str.replace(WHITESPACE.pattern, " ", regex=True)
+    texts = texts.str.replace(_stopword_pattern().pattern, "", regex=True)
+    return texts.str.replace(" +", " ", regex=True).str.strip(" ")
+
+
+def clean_series(texts, workers=1, chunk_size=50000):
+    """Clean a whole Series; matches ``texts.apply(clean_text)``.
+
+    Each distinct text is cleaned once with vectorized string ops. With
+    ``workers > 1`` the distinct texts are split into chunks and cleaned in a
+    process pool.
+    """
+    texts = pd.Series(texts)
+    codes, uniques = pd.factorize(texts, use_na_sentinel=False)
+    uniques = pd.Series(uniques, dtype=object)
+
+    if workers > 1 and len(uniques) > chunk_size:
+        chunks = [uniques.iloc[i:i + chunk_size] for i in range(0, len(uniques), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            cleaned = pd.concat(list(pool.map(_clean_unique, chunks)), ignore_index=True)
+    else:
+        cleaned = _clean_unique(uniques)
+
+    return pd.Series(cleaned.to_numpy(dtype=object)[codes], index=texts.index, dtype=object)
+
+
+def clean_columns(df, fields=TEXT_FIELDS, workers=1):
+    """Clean several text columns in one pass, writing each to its target column."""
+    fields = {src: dst for src, dst in fields.items() if src in df}
+    if not fields:
+        return df
+    stacked = pd.concat([df[src] for src in fields], ignore_index=True)
+    cleaned = clean_series(stacked, workers=workers).to_numpy()
+    n = len(df)
+    for i, dst in enumerate(fields.values()):
+        df[dst] = cleaned[i * n:(i + 1) * n]
+    return df
@@ -0,0 +1,99 @@
+"""Offline commands that populate the model registry.
+
+    python train.py nltk                          # register the VADER lexicon + stopwords
+    python train.py clusters --backend kmeans     # refit and register the cluster model
+    python train.py clusters --auto-k             # ... with the cluster count picked by silhouette
+    python train.py list                          # show registered artifacts
+"""
+import argparse
+import os
+import tempfile
+import zipfile
+
+import pandas as pd
+
+import registry
+
+
+# Download the NLTK resources once (needs network) and register them
+def register_nltk(registry_dir=registry.REGISTRY_DIR):
+    import nltk
+    from nltk.corpus.reader import WordListCorpusReader
+
+    with tempfile.TemporaryDirectory() as tmp:
+        nltk.download('vader_lexicon', download_dir=tmp, quiet=True, raise_on_error=True)
+        nltk.download('stopwords', download_dir=tmp, quiet=True, raise_on_error=True)
+
+        lexicon_path = os.path.join(tmp, "vader_lexicon.txt")
+        with zipfile.ZipFile(os.path.join(tmp, "sentiment", "vader_lexicon.zip")) as z:
+            with open(lexicon_path, "wb") as f:
+                f.write(z.read("vader_lexicon/vader_lexicon.txt"))
+        print("vader_lexicon", registry.publish("vader_lexicon", lexicon_path, registry_dir))
+
+        stopwords_dir = os.path.join(tmp, "corpora", "stopwords")
+        if not os.path.isdir(stopwords_dir):
+            with zipfile.ZipFile(stopwords_dir + ".zip") as z:
+                z.extractall(os.path.dirname(stopwords_dir))
+        words = WordListCorpusReader(stopwords_dir, ["english"]).words("english")
+        stopwords_path = os.path.join(tmp, "stopwords.txt")
+        with open(stopwords_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(words) + "\n")
+        print("stopwords", registry.publish("stopwords", stopwords_path, registry_dir))
+
+
+# Refit the cluster model on the scored corpus, register it and relabel the store
+def train_clusters(backend="kmeans", num_clusters=5, store_path=None, auto_k=False):
+    import pipeline
+    from clustering import choose_n_clusters
+    from store import ScoreStore
+
+    store = ScoreStore(store_path or pipeline.STORE_PATH)
+    try:
+        if len(store):
+            corpus = store.load(["id", "cleaned_headline"])
+        else:
+            corpus = pipeline.fetch_data()
+            if corpus is None:
+                raise SystemExit("No scored articles in the store and NewsData is unreachable")
+            corpus = pipeline.clean_columns(corpus)
+
+        if auto_k:
+            best_k, score = choose_n_clusters(corpus["cleaned_headline"])
+            if best_k is None:
+                raise SystemExit("Too few headlines to choose a cluster count")
+            print(f"Chose {best_k} clusters (silhouette {score:.3f})")
+            num_clusters = best_k
+        model, labels = pipeline.fit_clusterer(corpus["cleaned_headline"], num_clusters, backend)
+        entry = registry.publish_object(registry.CLUSTER_MODELS[backend], model)
+        print(registry.CLUSTER_MODELS[backend], entry)
+
+        if len(store):
+            store.set_clusters(pd.Series(labels, index=corpus["id"]))
+    finally:
+        store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Populate the model registry.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("nltk", help="download and register the VADER lexicon and stopwords")
+    clusters = sub.add_parser("clusters", help="refit and register the cluster model")
+    clusters.add_argument("--backend", choices=sorted(registry.CLUSTER_MODELS), default="kmeans")
+    clusters.add_argument("--clusters", type=int, default=5)
+    clusters.add_argument("--auto-k", action="store_true",
+                          help="pick the cluster count by silhouette score instead of --clusters")
+    clusters.add_argument("--store", default=None, help="score store to train on and relabel")
+    sub.add_parser("list", help="show registered artifacts")
+    args = parser.parse_args()
+
+    if args.command == "nltk":
+        register_nltk()
+    elif args.command == "clusters":
+        train_clusters(args.backend, args.clusters, args.store, args.auto_k)
+    else:
+        for name, entry in sorted(registry.manifest().items()):
+            print(f"{name:22} v{entry['version']:<3} {entry['created']}  {entry['sha256'][:12]}  {entry['file']}")
+
+
+if __name__ == "__main__":
+    main()
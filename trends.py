@@ -0,0 +1,236 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import instrument
+
+# Engine state saved next to the cubes it was folded from
+TREND_FILE = "trends.npz"
+
+# Half-life in days of the per-category exponentially weighted mean
+EWMA_HALFLIFE = float(os.environ.get("EWMA_HALFLIFE", "7"))
+
+
+def _daily(day_cube, dates, categories):
+    # Per-day sums and counts of a day cube as (dates x categories) arrays, zero-filled
+    if day_cube.empty:
+        shape = (len(dates), len(categories))
+        return np.zeros(shape), np.zeros(shape, dtype=np.int64)
+    wide = day_cube.assign(category=day_cube["category"].astype(str)).pivot_table(
+        index="date", columns="category", values=["sum", "count"], aggfunc="sum", fill_value=0,
+    )
+    sums = wide["sum"].reindex(index=dates, columns=categories, fill_value=0).to_numpy(np.float64)
+    counts = wide["count"].reindex(index=dates, columns=categories, fill_value=0).to_numpy(np.int64)
+    return sums, counts
+
+
+class TrendEngine:
+    """Daily per-category sentiment prefix sums with an incrementally folded EWMA.
+
+    Row ``i`` of ``cum_sum``/``cum_count`` holds the totals of all days before
+    ``start + i``, so any window's mean and volume is a difference of two rows
+    and a trend query costs O(days returned) however much history there is.
+    """
+
+    def __init__(self, halflife=EWMA_HALFLIFE):
+        self.halflife = halflife
+        self.start = None
+        self.categories = []
+        self.cum_sum = np.zeros((1, 0))
+        self.cum_count = np.zeros((1, 0), dtype=np.int64)
+        self.ewma = np.zeros((0, 0))
+
+    @property
+    def days(self):
+        return len(self.ewma)
+
+    # Last folded day, or None while empty
+    @property
+    def last_day(self):
+        return self.start + pd.Timedelta(days=self.days - 1) if self.days else None
+
+    def _add_categories(self, categories):
+        new = sorted(set(categories) - set(self.categories))
+        if new:
+            self.categories += new
+            self.cum_sum = np.hstack([self.cum_sum, np.zeros((len(self.cum_sum), len(new)))])
+            self.cum_count = np.hstack([self.cum_count, np.zeros((len(self.cum_count), len(new)), dtype=np.int64)])
+            self.ewma = np.hstack([self.ewma, np.full((len(self.ewma), len(new)), np.nan)])
+
+    def update(self, day_cube, since=None):
+        """Fold the days of ``day_cube`` from ``since`` on; returns the number of days folded.
+
+        ``since`` defaults to the last folded day, which is refolded in case it
+        was partial, so only new days are processed. Pass an earlier date to
+        take in late-arriving articles; ``day_cube`` must then cover every day
+        from there on.
+        """
+        day_cube = day_cube[["date", "category", "sum", "count"]]
+        since = pd.Timestamp(since) if since is not None else self.last_day
+        if since is not None:
+            day_cube = day_cube[day_cube["date"] >= since]
+        if day_cube.empty:
+            return 0
+
+        with instrument.stage("trend_fold") as timer:
+            if self.start is None:
+                self.start = since = day_cube["date"].min().normalize()
+            elif since < self.start:
+                raise ValueError(f"Cannot fold days before {self.start.date()}; rebuild the engine")
+            else:
+                since = min(since, self.last_day + pd.Timedelta(days=1))
+            self._add_categories(day_cube["category"].astype(str).unique())
+
+            # Drop everything from `since` on, then append it again from the cube
+            keep = (since - self.start).days
+            self.cum_sum = self.cum_sum[:keep + 1]
+            self.cum_count = self.cum_count[:keep + 1]
+            self.ewma = self.ewma[:keep]
+
+            dates = pd.date_range(since, day_cube["date"].max(), freq="D")
+            sums, counts = _daily(day_cube, dates, self.categories)
+
+            self.cum_sum = np.vstack([self.cum_sum, self.cum_sum[-1] + np.cumsum(sums, axis=0)])
+            self.cum_count = np.vstack([self.cum_count, self.cum_count[-1] + np.cumsum(counts, axis=0)])
+
+            alpha = 1 - 0.5 ** (1 / self.halflife)
+            prev = self.ewma[-1] if len(self.ewma) else np.full(len(self.categories), np.nan)
+            ewma = np.empty_like(sums)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                means = sums / counts
+            for i in range(len(dates)):
+                seen = counts[i] > 0
+                step = np.where(np.isnan(prev), means[i], prev + alpha * (means[i] - prev))
+                prev = np.where(seen, step, prev)
+                ewma[i] = prev
+            self.ewma = np.vstack([self.ewma, ewma])
+            timer.rows = len(dates)
+        return len(dates)
+
+    def first_change(self, day_cube):
+        """Earliest folded day whose sums or counts differ from ``day_cube``, or None.
+
+        Catches rescored, late or deleted articles on days the engine already
+        folded, which refolding from the last day alone would miss. The result
+        may be earlier than ``start`` when the cube now reaches further back.
+        """
+        if not self.days:
+            return None
+        day_cube = day_cube[["date", "category", "sum", "count"]]
+        if not day_cube.empty and day_cube["date"].min() < self.start:
+            return day_cube["date"].min().normalize()
+        dates = pd.date_range(self.start, self.last_day, freq="D")
+        categories = self.categories + sorted(set(day_cube["category"].astype(str)) - set(self.categories))
+        sums, counts = _daily(day_cube[day_cube["date"] <= self.last_day], dates, categories)
+        known = len(self.categories)
+        differs = (counts[:, :known] != np.diff(self.cum_count, axis=0)) | ~np.isclose(
+            sums[:, :known], np.diff(self.cum_sum, axis=0), rtol=1e-9, atol=1e-6,
+        )
+        changed = np.flatnonzero(differs.any(axis=1) | (counts[:, known:] > 0).any(axis=1))
+        return dates[changed[0]] if len(changed) else None
+
+    def _span(self, start, end):
+        # Day offsets [lo, hi) of the inclusive date range, clipped to the history
+        lo = 0 if start is None else max(0, (pd.Timestamp(start) - self.start).days)
+        hi = self.days if end is None else min(self.days, (pd.Timestamp(end) - self.start).days + 1)
+        return lo, max(lo, hi)
+
+    def _columns(self, categories):
+        if categories is None:
+            return np.arange(len(self.categories))
+        index = {c: i for i, c in enumerate(self.categories)}
+        return np.array([index[c] for c in categories if c in index], dtype=np.intp)
+
+    def rolling(self, window=30, start=None, end=None, categories=None):
+        """Trailing ``window``-day mean, volume and EWMA per category for each day in range.
+
+        Returns a long frame of date, category, mean, count and ewma; days with
+        no articles in the window have a NaN mean.
+        """
+        if not self.days:
+            return pd.DataFrame(columns=["date", "category", "mean", "count", "ewma"])
+        lo, hi = self._span(start, end)
+        cols = self._columns(categories)
+        ends = np.arange(lo, hi) + 1
+        starts = np.maximum(ends - window, 0)
+        sums = self.cum_sum[ends][:, cols] - self.cum_sum[starts][:, cols]
+        counts = self.cum_count[ends][:, cols] - self.cum_count[starts][:, cols]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(counts > 0, sums / counts, np.nan)
+
+        dates = self.start + pd.to_timedelta(np.arange(lo, hi), unit="D")
+        names = [self.categories[i] for i in cols]
+        return pd.DataFrame({
+            "date": np.repeat(dates, len(cols)),
+            "category": np.tile(names, len(dates)),
+            "mean": means.ravel(),
+            "count": counts.ravel(),
+            "ewma": self.ewma[lo:hi][:, cols].ravel(),
+        })
+
+    def window(self, start=None, end=None, categories=None):
+        """Mean and volume per category over one inclusive date range, in O(categories)."""
+        lo, hi = self._span(start, end)
+        cols = self._columns(categories)
+        sums = self.cum_sum[hi, cols] - self.cum_sum[lo, cols]
+        counts = self.cum_count[hi, cols] - self.cum_count[lo, cols]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(counts > 0, sums / counts, np.nan)
+        return pd.DataFrame({"category": [self.categories[i] for i in cols], "mean": means, "count": counts})
+
+    def save(self, path):
+        tmp = path + ".tmp.npz"
+        np.savez(
+            tmp, start=np.array([np.datetime64(self.start, "D") if self.start is not None else np.datetime64("NaT")]),
+            categories=np.array(self.categories, dtype=str), halflife=np.array([self.halflife]),
+            cum_sum=self.cum_sum, cum_count=self.cum_count, ewma=self.ewma,
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            engine = cls(halflife=float(data["halflife"][0]))
+            start = data["start"][0]
+            engine.start = None if np.isnat(start) else pd.Timestamp(start)
+            engine.categories = data["categories"].tolist()
+            engine.cum_sum = data["cum_sum"]
+            engine.cum_count = data["cum_count"]
+            engine.ewma = data["ewma"]
+        return engine
+
+
+def refresh(cube_dir, previous_dir=None, day_cube=None):
+    """Bring ``cube_dir``'s trend state up to date with its day cube and return it.
+
+    Starts from the state in ``previous_dir`` (or ``cube_dir`` itself) when
+    there is one, so only days from the first one whose totals changed (at the
+    latest its last folded day) are processed. The state is rebuilt when the
+    change lies outside what it can refold.
+    """
+    if day_cube is None:
+        day_cube = pd.read_parquet(os.path.join(cube_dir, "day.parquet"))
+    engine = None
+    for source in (cube_dir, previous_dir):
+        path = source and os.path.join(source, TREND_FILE)
+        if path and os.path.exists(path):
+            engine = TrendEngine.load(path)
+            break
+    since = None
+    if engine is not None and engine.halflife == EWMA_HALFLIFE:
+        since = engine.first_change(day_cube)
+        if since is not None and (since < engine.start or not (day_cube["date"] >= since).any()):
+            engine = None
+    if engine is None or engine.halflife != EWMA_HALFLIFE:
+        engine, since = TrendEngine(), None
+    engine.update(day_cube, since=since)
+    engine.save(os.path.join(cube_dir, TREND_FILE))
+    return engine
+
+
+def load_engine(cube_dir):
+    path = os.path.join(cube_dir, TREND_FILE)
+    if os.path.exists(path):
+        return TrendEngine.load(path)
+    return refresh(cube_dir)
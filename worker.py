@@ -0,0 +1,68 @@
+"""Background precompute worker.
+
+Runs the fetch -> sentiment -> clustering pipeline on a schedule and publishes
+each result as an immutable snapshot that appmain.py reads.
+
+    python worker.py --once               # one incremental run
+    python worker.py --interval 900       # every 15 minutes
+"""
+import argparse
+import os
+import time
+
+import instrument
+import snapshot
+from pipeline import TERMS_PATH, run_pipeline, store_version
+from terms import load_terms
+
+# Seconds between pipeline runs
+WORKER_INTERVAL = int(os.environ.get("WORKER_INTERVAL", "900"))
+
+
+def run_once(incremental=True, profile=None):
+    try:
+        with instrument.profiled("pipeline", profile):
+            df = run_pipeline(incremental=incremental)
+            if df is None or df.empty:
+                print("❌ Pipeline produced no data; keeping the current snapshot")
+                return None
+            # An unchanged store would only rotate good history out of KEEP_SNAPSHOTS;
+            # --full runs always publish
+            version = store_version() if incremental else None
+            latest = snapshot.latest_id()
+            if version is not None and latest and snapshot.source_version(latest) == version:
+                print(f"✅ Nothing changed since snapshot {latest}; not publishing")
+                return latest
+            with instrument.stage("publish", rows=len(df)):
+                term_table = load_terms(TERMS_PATH) if os.path.exists(TERMS_PATH) else None
+                snapshot_id = snapshot.publish(df, term_table=term_table, version=version)
+    finally:
+        instrument.export_prometheus()
+    print(f"✅ Published snapshot {snapshot_id} ({len(df)} articles)")
+    return snapshot_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the pipeline and publish dashboard snapshots.")
+    parser.add_argument("--once", action="store_true", help="run a single time and exit")
+    parser.add_argument("--full", action="store_true", help="rebuild from NewsData instead of the score store")
+    parser.add_argument("--interval", type=int, default=WORKER_INTERVAL)
+    parser.add_argument("--profile", choices=["cprofile", "pyinstrument"], default=None,
+                        help="capture a profile of the first run")
+    args = parser.parse_args()
+
+    profile = args.profile
+    while True:
+        start = time.monotonic()
+        try:
+            run_once(incremental=not args.full, profile=profile)
+        except Exception as e:
+            print("❌ Error:", e)
+        profile = ""  # profiling is a single-run capture
+        if args.once:
+            break
+        time.sleep(max(0, args.interval - (time.monotonic() - start)))
+
+
+if __name__ == "__main__":
+    main()